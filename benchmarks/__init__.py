@@ -0,0 +1,3 @@
+"""
+Benchmarks scripts, run them from project root: python -m benchmarks.<module>
+"""
@@ -0,0 +1,114 @@
+"""
+Local stand-in of Google geocoding and MediaWiki apis used by api connectors, for load tests
+without network. Point the app to it with GOOGLE_MAPS_API_URL=http://127.0.0.1:<port>/maps/api/geocode/json
+and WIKIPEDIA_API_URL=http://127.0.0.1:<port>/w/api.php
+
+python -m benchmarks.fake_upstream --port 8900 --latency lognormal:80,0.5 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+GEOCODE_PATH = "/maps/api/geocode/json"
+WIKIPEDIA_PATH = "/w/api.php"
+
+
+def latency_sampler(description):
+    """
+    :param description: "constant:<ms>", "uniform:<min ms>,<max ms>" or "lognormal:<median ms>,<sigma>"
+    :return: a function returning a latency in seconds
+    """
+    kind, _, values = description.partition(":")
+    numbers = [float(value) for value in values.split(",") if value]
+    if kind == "constant":
+        return lambda: numbers[0] / 1000
+    if kind == "uniform":
+        return lambda: random.uniform(numbers[0], numbers[1]) / 1000
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(0, numbers[1]) * numbers[0] / 1000
+    raise ValueError("unknown latency distribution %s" % description)
+
+
+def geocode_payload(address):
+    return {
+        "results": [{
+            "formatted_address": "%s, 75010 Paris, France" % address,
+            "geometry": {"location": {"lat": 48.8747578, "lng": 2.3505647}},
+        }],
+        "status": "OK",
+    }
+
+
+def opensearch_payload(search):
+    return [search, [search], ["%s est un lieu" % search], ["https://fr.wikipedia.org/wiki/%s" % search]]
+
+
+def query_payload(title, payload_size):
+    paragraph = ("<p><b>%s</b> est un lieu célèbre. " % title).ljust(payload_size, "x") + "</p>"
+    return {"query": {"pages": {"1": {"pageid": 1, "ns": 0, "title": title, "extract": paragraph}}}}
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    """
+    Answer geocoding and MediaWiki requests after a sampled latency
+    """
+    protocol_version = "HTTP/1.1"
+    latency = staticmethod(lambda: 0)
+    error_rate = 0.0
+    payload_size = 2000
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        time.sleep(self.latency())
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if random.random() < self.error_rate:
+            return self._send(500, {"status": "UNKNOWN_ERROR"})
+        if url.path == GEOCODE_PATH:
+            return self._send(200, geocode_payload(params.get("address", "")))
+        if url.path == WIKIPEDIA_PATH and params.get("action") == "opensearch":
+            return self._send(200, opensearch_payload(params.get("search", "")))
+        if url.path == WIKIPEDIA_PATH and params.get("action") == "query":
+            return self._send(200, query_payload(params.get("titles", ""), self.payload_size))
+        return self._send(404, {"error": "unknown endpoint"})
+
+
+def make_server(host="127.0.0.1", port=8900, latency="constant:0", error_rate=0.0, payload_size=2000):
+    handler = type("ConfiguredHandler", (FakeUpstreamHandler,), {
+        "latency": staticmethod(latency_sampler(latency)),
+        "error_rate": error_rate,
+        "payload_size": payload_size,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument("--host", default="127.0.0.1")
+    arguments.add_argument("--port", type=int, default=8900)
+    arguments.add_argument("--latency", default="constant:0", help="latency distribution of each response")
+    arguments.add_argument("--error-rate", type=float, default=0.0, help="part of responses failing with 500")
+    arguments.add_argument("--payload-size", type=int, default=2000, help="size of wikipedia extracts in bytes")
+    options = arguments.parse_args()
+    server = make_server(options.host, options.port, options.latency, options.error_rate, options.payload_size)
+    print("fake upstream listening on http://%s:%s" % (options.host, options.port), flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Import time report of the app, from `python -X importtime` output of fresh interpreters.
+Each scenario is run several times and the best run is kept, modules are grouped by top level package.
+Run from project root: python -m benchmarks.import_time [--top 15]
+"""
+import argparse
+import collections
+import os
+import subprocess
+import sys
+import time
+
+SCENARIOS = (
+    ("config", "import config"),
+    ("webapp package", "import webapp"),
+    ("create_app", "from webapp import create_app; create_app('config.TestConfig')"),
+    ("first request", "from webapp import create_app; app = create_app('config.TestConfig'); "
+                      "app.test_client().get('/sentences')"),
+)
+
+
+def run_scenario(statement):
+    """
+    :param statement: python statement run in a fresh interpreter
+    :return: tuple (wall time in seconds, list of (module, self us, cumulative us))
+    """
+    env = dict(os.environ, FLASK_CONFIG="config.TestConfig")
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], env=env,
+                             stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, check=True, text=True)
+    wall_time = time.perf_counter() - start
+    modules = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, module = line[len("import time:"):].split("|")
+        modules.append((module.strip(), int(self_time), int(cumulative)))
+    return wall_time, modules
+
+
+def by_package(modules):
+    """
+    :return: dict of top level package to self import time in us
+    """
+    packages = collections.Counter()
+    for module, self_time, cumulative in modules:
+        packages[module.split(".")[0]] += self_time
+    return packages
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--repeat", type=int, default=5)
+    arguments.add_argument("--top", type=int, default=12, help="packages listed for each scenario")
+    options = arguments.parse_args()
+
+    for name, statement in SCENARIOS:
+        runs = [run_scenario(statement) for _ in range(options.repeat)]
+        wall_time, modules = min(runs, key=lambda run: run[0])
+        packages = by_package(modules)
+        print("%s: %.0f ms wall, %.0f ms imports, %d modules" % (
+            name, wall_time * 1000, sum(packages.values()) / 1000, len(modules)))
+        for package, self_time in packages.most_common(options.top):
+            print("    %-24s %8.1f ms" % (package, self_time / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Startup cost of the lexicon: building it from data files against loading a prebuilt artifact.
+Categories whose production files are missing are taken from test samples.
+Run from project root: python -m benchmarks.lexicon_artifact
+"""
+import os
+import tempfile
+import time
+
+import config
+from webapp import create_app
+from webapp.parser.artifact import LexiconArtifact, build_artifact
+
+
+def production_like_data_config():
+    data_config = dict()
+    for category, category_config in config.Config.DATA_LOAD_CONFIG.items():
+        if all(os.path.exists(path) for path in category_config["files"]):
+            data_config[category] = category_config
+        else:
+            data_config[category] = config.TestConfig.DATA_LOAD_CONFIG[category]
+    return data_config
+
+
+def main():
+    app = create_app("config.TestConfig")
+    app.config["DATA_LOAD_CONFIG"] = production_like_data_config()
+    with app.app_context(), tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        artifact = build_artifact(app.config["DATA_LOAD_CONFIG"], app.config["SPELLING_CATEGORIES"],
+                                  app.config["SPELLING_MAX_DISTANCE"])
+        build_time = time.perf_counter() - start
+        path = os.path.join(folder, "lexicon.bin")
+        artifact.save(path)
+
+        start = time.perf_counter()
+        loaded = LexiconArtifact.load(path)
+        load_time = time.perf_counter() - start
+        print("%d words, %d spelling names, artifact of %.1f MB" % (
+            len(loaded.lexicon), len(loaded.spelling_index.words), os.path.getsize(path) / 1024 / 1024))
+        print("build from data files: %8.3f s" % build_time)
+        print("load artifact:         %8.3f s" % load_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Query plans and durations of lexicon lookups: join of Word and WordType tables against
+primary key probes of LexiconEntry table. Works with SQLite and PostgreSQL.
+Production data files are loaded in the database given as argument (test database by default) and tables are dropped
+at the end: never run it against a production database.
+Run from project root: python -m benchmarks.lexicon_query_plan [database_url]
+"""
+import sys
+import timeit
+
+from sqlalchemy import select, text
+
+import config
+from benchmarks.lexicon_artifact import production_like_data_config
+from webapp import create_app, db
+from webapp.models import LexiconEntry, Word, WordType
+from webapp.parser.lexicon import LEXICONS
+from webapp.parser.matchers import normalize_key, phrase_candidates
+from webapp.word_files_handler.initial_data_handlers import load_words_to_db
+
+QUESTION = "Salut GrandPy ! Est-ce que tu connais l'adresse d'Openclassrooms à Paris ? Je paris que tu ne sais " \
+           "pas où se trouve Saint-Étienne, ni la rue de la République à Lyon ou le musée du Louvre"
+
+
+def explain(statement):
+    """
+    :param statement: a select statement
+    :return: query plan lines of statement with its parameters
+    """
+    compiled = statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN " if db.engine.dialect.name == "sqlite" else "EXPLAIN "
+    rows = db.session.execute(text(prefix + str(compiled))).all()
+    return [" ".join(str(value) for value in row) for row in rows]
+
+
+def main():
+    database_uri = sys.argv[1] if len(sys.argv) > 1 else config.TestConfig.SQLALCHEMY_DATABASE_URI
+    app = create_app(type("BenchmarkConfig", (config.TestConfig,), {"SQLALCHEMY_DATABASE_URI": database_uri}))
+    app.config["DATA_LOAD_CONFIG"] = production_like_data_config()
+    with app.app_context():
+        db.create_all()
+        try:
+            load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+            keys = sorted({normalize_key(word) for word in phrase_candidates(QUESTION, 4)})
+            print("%s, %d words, %d lexicon entries, %d question keys" % (
+                db.engine.dialect.name, db.session.query(Word).count(), db.session.query(LexiconEntry).count(),
+                len(keys)))
+
+            statements = [
+                ("join Word and WordType", select(Word.key, WordType.type_name)
+                 .join(WordType, Word.category == WordType.id).where(Word.key.in_(keys))),
+                ("LexiconEntry probes", select(LexiconEntry.key, LexiconEntry.categories)
+                 .where(LexiconEntry.key.in_(keys))),
+            ]
+            for name, statement in statements:
+                print("\n%s:" % name)
+                for line in explain(statement):
+                    print("    %s" % line)
+
+            print()
+            repeat = 200
+            for name, statement in statements:
+                duration = timeit.timeit(lambda: db.session.execute(statement).all(), number=repeat) / repeat
+                print("%-24s %8.3f ms / question" % (name, duration * 1000))
+            duration = timeit.timeit(lambda: LEXICONS.database.lookup(keys), number=repeat) / repeat
+            print("%-24s %8.3f ms / question" % ("DatabaseLexicon.lookup", duration * 1000))
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Load test of /process with gunicorn and a local stand-in of upstream apis, no network needed.
+Every combination of workers and threads is started in turn and loaded by concurrent clients. Threads are
+passed as GUNICORN_THREADS, which also sizes admission control and the database pool of each worker.
+
+python -m benchmarks.load_test --workers 1,2,4 --threads 1,4 --concurrency 16 --duration 20 \\
+    --latency lognormal:80,0.5 --init-db
+"""
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+
+from benchmarks.fake_upstream import make_server
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "data_files_test", "questions", "questions_sample.txt")
+
+
+def percentile(values, rank):
+    """
+    :param values: sorted values
+    :param rank: percentile between 0 and 100
+    :return: nearest rank percentile
+    """
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(round(rank / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def load_questions():
+    with open(QUESTIONS_PATH, "r") as questions_file:
+        return [line.strip() for line in questions_file if line.strip()]
+
+
+def client(host, port, questions, deadline, latencies, errors, offset):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    index = offset
+    while time.perf_counter() < deadline:
+        body = urlencode({"search": questions[index % len(questions)]})
+        index += 1
+        start = time.perf_counter()
+        try:
+            connection.request("POST", "/process", body, {"Content-Type": "application/x-www-form-urlencoded"})
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as error:
+            errors.append(type(error).__name__)
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def run_load(host, port, questions, concurrency, duration):
+    """
+    :return: dict with throughput, latency percentiles in ms and errors count
+    """
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=client, args=(host, port, questions, deadline, latencies, errors, offset))
+               for offset in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput": len(latencies) / duration,
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+    }
+
+
+def wait_until_ready(host, port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request("GET", "/sentences")
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("application did not start on port %s" % port)
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument("--workers", default="1,2,4", help="comma separated gunicorn workers counts")
+    arguments.add_argument("--threads", default="1,4", help="comma separated gunicorn threads counts")
+    arguments.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    arguments.add_argument("--duration", type=float, default=20, help="seconds of load for each setting")
+    arguments.add_argument("--config", default="config.DevConfig", help="FLASK_CONFIG of the application")
+    arguments.add_argument("--init-db", action="store_true", help="run flask init-db before loading")
+    arguments.add_argument("--app-port", type=int, default=8901)
+    arguments.add_argument("--upstream-port", type=int, default=8900)
+    arguments.add_argument("--latency", default="lognormal:80,0.5", help="upstream latency distribution")
+    arguments.add_argument("--error-rate", type=float, default=0.0, help="part of upstream responses failing")
+    arguments.add_argument("--payload-size", type=int, default=2000, help="size of wikipedia extracts in bytes")
+    options = arguments.parse_args()
+
+    host = "127.0.0.1"
+    upstream = make_server(host, options.upstream_port, options.latency, options.error_rate, options.payload_size)
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+
+    env = dict(os.environ)
+    env.update({
+        "FLASK_APP": "run.py",
+        "FLASK_CONFIG": options.config,
+        "GOOGLE_MAPS_API_URL": "http://%s:%s/maps/api/geocode/json" % (host, options.upstream_port),
+        "WIKIPEDIA_API_URL": "http://%s:%s/w/api.php" % (host, options.upstream_port),
+    })
+    if options.init_db:
+        subprocess.run([sys.executable, "-m", "flask", "init-db"], env=env, check=True)
+
+    questions = load_questions()
+    print("%8s %8s %10s %8s %8s %8s %8s %8s" % ("workers", "threads", "requests", "errors", "req/s",
+                                                "p50 ms", "p95 ms", "p99 ms"))
+    for workers in [int(value) for value in options.workers.split(",")]:
+        for threads in [int(value) for value in options.threads.split(",")]:
+            # --threads would leave admission control sized for the default thread count
+            server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-w", str(workers),
+                                       "-b", "%s:%s" % (host, options.app_port)],
+                                      env=dict(env, GUNICORN_THREADS=str(threads)),
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_ready(host, options.app_port)
+                run_load(host, options.app_port, questions, options.concurrency, 1)
+                result = run_load(host, options.app_port, questions, options.concurrency, options.duration)
+            finally:
+                server.terminate()
+                server.wait()
+            print("%8d %8d %10d %8d %8.1f %8.1f %8.1f %8.1f" % (
+                workers, threads, result["requests"], result["errors"], result["throughput"],
+                result["p50"], result["p95"], result["p99"]), flush=True)
+    upstream.shutdown()
+
+
+if __name__ == "__main__":
+    main()
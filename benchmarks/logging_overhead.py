@@ -0,0 +1,64 @@
+"""
+Benchmark of logging cost per parsed question with legacy and configured logging setups.
+Lexicon lookup is replaced by a fixed extract so that only parsing and logging are measured.
+"""
+import logging
+import os
+import timeit
+
+from webapp import app
+from webapp.log import configure_logging
+from webapp.parser.controller import ParsingController
+
+QUESTION = "Salut GrandPy ! Est-ce que tu connais l'adresse d'Openclassrooms à Paris ?"
+EXTRACT = {
+    "stop_words": ["d", "l", "que", "tu", "à", "ce"],
+    "french_words": ["adresse", "connais", "que", "tu", "salut", "paris"],
+    "cities": ["Paris"],
+}
+
+
+class OfflineParsingController(ParsingController):
+    def ask_database(self):
+        return EXTRACT
+
+
+def legacy_setup():
+    """
+    former behaviour: root logger at DEBUG writing synchronously, every debug trace kept
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(logging.DEBUG)
+    root.addHandler(logging.StreamHandler(open(os.devnull, "w")))
+
+
+def configured_setup(**config):
+    app.config.update(config)
+    listener = configure_logging(app)
+    if listener is not None:
+        listener.handlers[0].setStream(open(os.devnull, "w"))
+
+
+def measure(number=2000):
+    return timeit.timeit(lambda: OfflineParsingController(QUESTION), number=number) / number * 10 ** 6
+
+
+def main():
+    setups = [
+        ("legacy DEBUG, synchronous", legacy_setup, dict()),
+        ("DEBUG, queue, 1% sampled", configured_setup,
+         dict(LOG_LEVEL="DEBUG", LOG_QUEUE=True, LOG_DEBUG_SAMPLE_RATE=0.01)),
+        ("INFO, queue", configured_setup, dict(LOG_LEVEL="INFO", LOG_QUEUE=True)),
+        ("WARNING, queue (production)", configured_setup, dict(LOG_LEVEL="WARNING", LOG_QUEUE=True)),
+    ]
+    with app.app_context():
+        for name, setup, config in setups:
+            setup(**config)
+            measure(100)
+            print("%-30s %8.1f us per question" % (name, measure()))
+
+
+if __name__ == "__main__":
+    main()
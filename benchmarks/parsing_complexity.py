@@ -0,0 +1,57 @@
+"""
+Parsing time of questions from 10 to 10,000 words with memory and database lexicons.
+Time per word must stay flat when question grows: parsing is linear and database lookups are chunked.
+Run from project root: python -m benchmarks.parsing_complexity
+"""
+import random
+import timeit
+
+from webapp import create_app, db
+from webapp.parser.controller import ParsingController
+from webapp.parser.lexicon import LEXICONS, MemoryLexicon
+from webapp.search_manager import limit_question
+from webapp.word_files_handler.initial_data_handlers import load_words_to_db
+
+WORDS = ["Salut", "GrandPy", "je", "voudrais", "savoir", "où", "se", "trouve", "la", "rue", "de", "République",
+         "à", "Lyon", "et", "si", "tu", "connais", "Saint-Étienne", "Le", "Mans", "ou", "Aix", "en", "Provence",
+         "?", "!", "merci", "beaucoup", "musée", "du", "Louvre", "Paris", "Budapest", "mes", "amis", "disent"]
+
+
+def build_question(words_count, seed=0):
+    """
+    a pasted text: half of the words are known ones, the other half are all different
+    """
+    generator = random.Random(seed)
+    return " ".join(generator.choice(WORDS) if generator.random() < 0.5 else "mot%d" % index
+                    for index in range(words_count))
+
+
+def main():
+    app = create_app("config.TestConfig")
+    with app.app_context():
+        db.create_all()
+        try:
+            load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+            lexicons = [("memory", MemoryLexicon.from_data_files(app.config["DATA_LOAD_CONFIG"])),
+                        ("database", LEXICONS.database)]
+            print("%10s %10s %14s %12s" % ("words", "lexicon", "parsing (ms)", "us / word"))
+            for words_count in (10, 100, 1000, 10000):
+                question = build_question(words_count)
+                repeat = max(1, 1000 // words_count)
+                for name, lexicon in lexicons:
+                    duration = timeit.timeit(lambda: ParsingController(question, lexicon=lexicon),
+                                             number=repeat) / repeat
+                    print("%10d %10s %14.3f %12.3f" % (words_count, name, duration * 1000,
+                                                       duration / words_count * 10 ** 6))
+
+            max_tokens = app.config["MAX_QUESTION_TOKENS"]
+            question = build_question(10000)
+            duration = timeit.timeit(lambda: limit_question(question, max_tokens), number=100) / 100
+            print("truncating 10000 words to %d: %.3f ms" % (max_tokens, duration * 1000))
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
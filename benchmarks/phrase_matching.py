@@ -0,0 +1,48 @@
+"""
+Benchmark of multi-word names matching on long inputs.
+Time per word must stay flat when input grows: matching is linear.
+"""
+import random
+import timeit
+
+from webapp.parser.matchers import PhraseMatcher, phrase_candidates
+
+NAMES = ["Le Mans", "Saint-Étienne", "Aix-en-Provence", "Royaume-Uni", "États-Unis", "Saint-Germain-en-Laye",
+         "Boulogne-sur-Mer", "La Rochelle", "Les Sables-d'Olonne", "Paris", "Lyon", "Budapest"]
+FILLER = ["je", "voudrais", "savoir", "où", "se", "trouve", "la", "ville", "de", "Saint", "Le", "en", "sur"]
+
+
+def build_lexicon(size):
+    """
+    :param size: number of generated names added to real ones
+    :return: a list of names
+    """
+    generated = ["Ville-%d-sur-Mer" % index for index in range(size)]
+    return NAMES + generated
+
+
+def build_input(words_count, seed=0):
+    generator = random.Random(seed)
+    words = []
+    while len(words) < words_count:
+        if generator.random() < 0.1:
+            words += generator.choice(NAMES).split()
+        else:
+            words.append(generator.choice(FILLER))
+    return " ".join(words[:words_count])
+
+
+def main():
+    matcher = PhraseMatcher(build_lexicon(100000))
+    print("%10s %14s %14s %12s" % ("words", "match (ms)", "ngrams (ms)", "us / word"))
+    for words_count in (10, 100, 1000, 10000, 100000):
+        in_string = build_input(words_count)
+        repeat = max(1, 10000 // words_count)
+        match_time = timeit.timeit(lambda: matcher.find_all(in_string), number=repeat) / repeat
+        ngrams_time = timeit.timeit(lambda: phrase_candidates(in_string, 4), number=repeat) / repeat
+        print("%10d %14.3f %14.3f %12.3f" % (words_count, match_time * 1000, ngrams_time * 1000,
+                                             (match_time + ngrams_time) / words_count * 10 ** 6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Coverage of question templates on a traffic sample and parsing time they save.
+Questions are read from a file, one per line (test questions sample by default).
+Run from project root: python -m benchmarks.question_templates [questions_file]
+"""
+import os
+import sys
+import timeit
+
+import config
+from webapp import create_app
+from webapp.parser.controller import ParsingController
+from webapp.parser.lexicon import MemoryLexicon
+from webapp.parser.templates import QuestionTemplates
+
+
+def load_questions(path):
+    with open(path, "r") as questions_file:
+        return [line.strip() for line in questions_file if line.strip()]
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(config.TestConfig.DATA_PATH,
+                                                              "questions/questions_sample.txt")
+    app = create_app("config.TestConfig")
+    with app.app_context():
+        questions = load_questions(path)
+        lexicon = MemoryLexicon.from_data_files(app.config["DATA_LOAD_CONFIG"])
+        templates = QuestionTemplates.from_file(app.config["QUESTION_TEMPLATES_FILE"])
+        matched = [question for question in questions if templates.match(question) is not None]
+        disagreements = [question for question in matched
+                         if [templates.match(question)] != ParsingController(question, lexicon=lexicon).out_list[:1]]
+
+        repeat = 20
+        template_time = timeit.timeit(lambda: [templates.match(question) for question in matched],
+                                      number=repeat) / repeat
+        parsers_time = timeit.timeit(lambda: [ParsingController(question, lexicon=lexicon) for question in matched],
+                                     number=repeat) / repeat
+        miss_time = timeit.timeit(lambda: [templates.match(question) for question in questions
+                                           if question not in matched], number=repeat) / repeat
+
+        print("%d questions, %d matched by a template (%.0f %%), %d subjects differ from parsers" % (
+            len(questions), len(matched), len(matched) / len(questions) * 100, len(disagreements)))
+        for question in disagreements:
+            print("  differs: %s" % question)
+        if matched:
+            print("template match:      %8.3f ms / question" % (template_time / len(matched) * 1000))
+            print("parsers:             %8.3f ms / question" % (parsers_time / len(matched) * 1000))
+        if len(questions) > len(matched):
+            print("template miss cost:  %8.3f ms / question" % (miss_time / (len(questions) - len(matched)) * 1000))
+        print("parsing time saved:  %8.3f ms on sample" % ((parsers_time - template_time - miss_time) * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Benchmark of misspelled place names lookup in deletion index.
+"""
+import random
+import string
+import time
+import timeit
+
+from webapp.parser.matchers import DeletionIndex
+
+MISSPELLED = ["Marseile", "Bordaux", "Budapets", "Strasbourgg", "Toulous", "Montpelier", "Saint-Etiene"]
+NAMES = ["Marseille", "Bordeaux", "Budapest", "Strasbourg", "Toulouse", "Montpellier", "Saint-Etienne"]
+
+
+def build_lexicon(size, seed=0):
+    generator = random.Random(seed)
+    words = set(NAMES)
+    while len(words) < size:
+        length = generator.randint(4, 14)
+        words.add("".join(generator.choice(string.ascii_lowercase) for _ in range(length)).capitalize())
+    return list(words)
+
+
+def main():
+    for size in (1000, 10000, 50000):
+        lexicon = build_lexicon(size)
+        start = time.perf_counter()
+        index = DeletionIndex(lexicon)
+        build_time = time.perf_counter() - start
+        number = 200
+        lookup_time = timeit.timeit(lambda: [index.lookup(word) for word in MISSPELLED], number=number)
+        lookup_time /= number * len(MISSPELLED)
+        print("%6d names: index built in %.2f s, %d deletes, %.3f ms per lookup" % (
+            size, build_time, len(index.deletes), lookup_time * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 import os
-import random
-import string
+import re
 
 base_dir = os.path.abspath(os.path.dirname(__file__))
 
@@ -13,6 +12,11 @@ except FileNotFoundError:
     from_file_key = str()
 
 GOOGLE_MAP_API_KEY = os.environ.get('GOOGLE_MAP_API_KEY') or from_file_key
+# apis endpoints, can be pointed to a local stand-in for load tests (see benchmarks/fake_upstream.py)
+GOOGLE_MAPS_API_URL = os.environ.get('GOOGLE_MAPS_API_URL') or "https://maps.googleapis.com/maps/api/geocode/json"
+WIKIPEDIA_API_URL = os.environ.get('WIKIPEDIA_API_URL') or "https://fr.wikipedia.org/w/api.php"
+# threads of each gunicorn worker (see gunicorn.conf.py), admission control and database pool are sized from it
+GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS') or 8)
 
 class Config(object):
     DEBUG = False
@@ -24,6 +28,84 @@ class Config(object):
     DATA_FOLDER = "data_files"
     DATA_PATH = os.path.join(base_dir, DATA_FOLDER)
 
+    # fingerprinted static files, built by flask build_static_assets
+    ASSETS_BUILD_FOLDER = os.path.join(base_dir, "build", "assets")
+
+    # logging, records are written by a background thread when LOG_QUEUE is True.
+    # LOG_DEBUG_SAMPLE_RATE is the part of requests whose debug traces are kept
+    LOG_LEVEL = "INFO"
+    LOG_FORMAT = "text"
+    LOG_QUEUE = True
+    LOG_DEBUG_SAMPLE_RATE = 1.0
+
+    # stage durations in Server-Timing header and /metrics
+    METRICS_ENABLED = True
+
+    # /process is profiled when X-Profile-Token header matches PROFILING_TOKEN, or for a sample of requests
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN') or ""
+    PROFILING_SAMPLE_RATE = 0.0
+    PROFILING_DIR = os.path.join(base_dir, "profiles")
+
+    # POST /admin/lexicon/reload with X-Admin-Token header rebuilds the lexicon from DATA_LOAD_CONFIG files,
+    # disabled when ADMIN_TOKEN is empty and refused with database backend (use flask reload-lexicon).
+    # Workers check LEXICON_STAMP_FILE every LEXICON_RELOAD_CHECK_INTERVAL seconds to follow reloads done by
+    # another process (0 disables checks)
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN') or ""
+    LEXICON_STAMP_FILE = os.path.join(base_dir, "lexicon.stamp")
+    LEXICON_RELOAD_CHECK_INTERVAL = 5
+
+    # admission control of /process in each worker: requests beyond ADMISSION_MAX_CONCURRENCY wait
+    # at most ADMISSION_MAX_WAIT seconds in a queue of ADMISSION_MAX_QUEUE places, others get a 503.
+    # Requests only reach the queue if gunicorn threads outnumber slots: by default half of the threads
+    # run searches and the other half are the queue places.
+    # When all slots are taken, answers of the last ANSWER_CACHE_SIZE questions younger than ANSWER_CACHE_TTL
+    # are served without waiting. ADMISSION_MAX_CONCURRENCY = 0 disables admission control
+    ADMISSION_MAX_CONCURRENCY = int(os.environ.get('ADMISSION_MAX_CONCURRENCY') or max(1, GUNICORN_THREADS // 2))
+    ADMISSION_MAX_QUEUE = max(0, GUNICORN_THREADS - ADMISSION_MAX_CONCURRENCY)
+    ADMISSION_MAX_WAIT = 2.0
+    ADMISSION_RETRY_AFTER = 5
+    ANSWER_CACHE_SIZE = 512
+    ANSWER_CACHE_TTL = 3600
+
+    # "store" answers wikipedia searches from WIKIPEDIA_STORE, built from a dump by flask build-wiki-store,
+    # and calls the api only for titles it lacks. "api" always calls the api
+    WIKIPEDIA_MODE = os.environ.get('WIKIPEDIA_MODE') or "api"
+    WIKIPEDIA_STORE = os.environ.get('WIKIPEDIA_STORE') or os.path.join(base_dir, "build", "wikipedia.store")
+
+    # "database" looks words up in Word table, "memory" loads DATA_LOAD_CONFIG files in each worker,
+    # "artifact" loads LEXICON_ARTIFACT file built by flask build-lexicon (no data files nor database needed)
+    LEXICON_BACKEND = os.environ.get('LEXICON_BACKEND') or "database"
+    LEXICON_ARTIFACT = os.environ.get('LEXICON_ARTIFACT') or os.path.join(base_dir, "build", "lexicon.bin")
+
+    # number of parsed questions kept in memory, 0 disables parsing cache
+    PARSING_CACHE_SIZE = 1024
+    # questions parsed by the gunicorn master before forking workers, see webapp/warmup.py
+    WARMUP_QUESTIONS = (
+        "Salut GrandPy ! Est-ce que tu connais l'adresse d'OpenClassrooms à Paris ?",
+        "Où se trouve la tour Eiffel ?",
+    )
+
+    LANDMARKS_FILE = os.path.join(DATA_PATH, "landmarks/landmarks.txt")
+    # questions matching one of these templates are not parsed, empty value disables templates
+    QUESTION_TEMPLATES_FILE = os.path.join(DATA_PATH, "templates/question_templates.txt")
+    # "full" runs every parser, "pipeline" runs parsers by cost and stops as soon as a parser
+    # with a confidence above PARSING_CONFIDENCE_THRESHOLD finds words (see ParsingController).
+    # Both modes only guarantee the same first term, the one sent to apis: the following terms differ
+    PARSING_MODE = os.environ.get('PARSING_MODE') or "full"
+    PARSING_CONFIDENCE_THRESHOLD = 0.9
+    # longest city or country name searched in lexicon, in words ("Saint-Germain-en-Laye" has 4 words)
+    MAX_PHRASE_TOKENS = 4
+    # maximum number of keys of one lexicon database query, on databases other than SQLite and PostgreSQL
+    # which bind all keys of a question as a single array parameter
+    LEXICON_LOOKUP_CHUNK_SIZE = 500
+    # questions longer than MAX_QUESTION_TOKENS words are truncated or rejected with a 413
+    # according to LONG_QUESTION_POLICY ("truncate" or "reject"), 0 disables the limit
+    MAX_QUESTION_TOKENS = 300
+    LONG_QUESTION_POLICY = "truncate"
+    # misspelled names of these categories are corrected before calling apis, 0 disables correction
+    SPELLING_CATEGORIES = ("cities", "countries")
+    SPELLING_MAX_DISTANCE = 2
+
     DATA_LOAD_CONFIG = {
         "stop_words": {
             "files": [os.path.join(DATA_PATH, "stop_words/stop_words.txt")],
@@ -59,6 +141,8 @@ class TestConfig(Config):
     DATA_FOLDER = "data_files_test"
     DATA_PATH = os.path.join(base_dir, DATA_FOLDER)
 
+    LANDMARKS_FILE = os.path.join(DATA_PATH, "landmarks/landmarks_sample.txt")
+
     DATA_LOAD_CONFIG = {
         "stop_words": {
             "files": [os.path.join(DATA_PATH, "stop_words/stop_words_sample.txt")],
@@ -82,21 +166,31 @@ class TestConfig(Config):
 
 
 class DevConfig(Config):
+    LOG_LEVEL = "DEBUG"
     SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(base_dir, "grandpy.db")
 
 
 class ProdConfig(Config):
     DEBUG = False
     TESTING = False
-    if not os.path.exists('secret.txt'):
-        with open('secret.txt', 'w') as secret_file:
-            new_secret = "".join(
-                [random.choice(string.ascii_letters + string.digits + string.punctuation) for _ in range(24)])
-            secret_file.write(new_secret)
-    with open('secret.txt', 'r') as secret_file:
-        SECRET_KEY = "".join(secret_file.readlines())
+    LOG_LEVEL = "WARNING"
+    LOG_FORMAT = "json"
+    LOG_DEBUG_SAMPLE_RATE = 0.01
+    # read (and generated the first time) from SECRET_KEY_FILE by create_app when not in environment
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+    SECRET_KEY_FILE = os.path.join(base_dir, "secret.txt")
 
     if os.environ.get('DATABASE_URL') is None:
         SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(base_dir, "grandpy.db")
     else:
-        SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+        # heroku still gives postgres:// urls which SQLAlchemy does not know, psycopg2 is the installed driver
+        SQLALCHEMY_DATABASE_URI = re.sub(r"^postgres://", "postgresql+psycopg2://", os.environ.get('DATABASE_URL'))
+        # each gunicorn worker has its own pool (see post_fork in webapp/warmup.py), one connection per thread
+        # and a few more for admin requests. Connections are checked before use and renewed every 30 minutes.
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            "pool_size": int(os.environ.get('DATABASE_POOL_SIZE') or GUNICORN_THREADS),
+            "max_overflow": int(os.environ.get('DATABASE_MAX_OVERFLOW') or 2),
+            "pool_timeout": 5,
+            "pool_recycle": 1800,
+            "pool_pre_ping": True,
+        }
@@ -0,0 +1,31 @@
+"""
+Gunicorn settings: application is loaded and warmed up once in master, then shared by forked workers
+"""
+import os
+
+from config import GUNICORN_THREADS
+
+bind = "0.0.0.0:%s" % os.environ.get("PORT", "8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+# threads beyond ADMISSION_MAX_CONCURRENCY hold requests in the admission queue, where their wait is
+# bounded and measured. The listen backlog is kept short so that excess load is not queued unseen in the kernel
+threads = GUNICORN_THREADS
+backlog = int(os.environ.get("GUNICORN_BACKLOG", "64"))
+preload_app = True
+wsgi_app = "webapp:create_app()"
+
+
+def when_ready(server):
+    from webapp.warmup import warm_up
+    warm_up(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    from webapp.warmup import post_fork as setup_worker
+    setup_worker(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    # kill -USR2 <worker pid> reloads the lexicon of a worker, SIGUSR2 sent to master is a binary upgrade
+    from webapp.reload import install_signal_handler
+    install_signal_handler()
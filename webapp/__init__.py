@@ -1,19 +1,83 @@
+"""
+Application factory. Routes, parsers and api connectors are imported when an app is created,
+`webapp.app` is a default app created on first access for the CLI (run.py) and tests.
+"""
 import os
+import secrets
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 
-app = Flask(__name__)
-config = os.environ.get('FLASK_CONFIG') or 'config.DevConfig'
-app.config.from_object(config)
-db = SQLAlchemy(app)
-from webapp import routes
-from webapp.word_files_handler.initial_data_handlers import FiletoDbHandler
+db = SQLAlchemy()
+
+
+def load_secret_key(path):
+    """
+    read secret key stored in path, a new one is generated the first time
+    :param path: secret file path
+    :return: secret key
+    """
+    if not os.path.exists(path):
+        with open(path, "w") as secret_file:
+            secret_file.write(secrets.token_urlsafe(32))
+    with open(path, "r") as secret_file:
+        return secret_file.read().strip()
+
+
+def create_app(config_object=None):
+    """
+    :param config_object: config class or import path, FLASK_CONFIG environment variable or config.DevConfig by default
+    :return: a configured flask app
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_object or os.environ.get("FLASK_CONFIG") or "config.DevConfig")
+    if not app.config.get("SECRET_KEY") and app.config.get("SECRET_KEY_FILE"):
+        app.config["SECRET_KEY"] = load_secret_key(app.config["SECRET_KEY_FILE"])
+    db.init_app(app)
 
+    from webapp.admin import bp as admin_bp
+    from webapp.admission import ADMISSION, ANSWER_CACHE
+    from webapp.assets import init_assets
+    from webapp.commands import build_lexicon, build_static_assets, build_wiki_store, init_db, reload_lexicon, \
+        upgrade_db
+    from webapp.log import configure_logging
+    from webapp.metrics import init_metrics
+    from webapp.parser.cache import PARSING_CACHE
+    from webapp.parser.spelling import PLACE_NAMES_SPELLER
+    from webapp.parser.templates import QUESTION_TEMPLATES
+    from webapp.query_counter import QUERY_COUNTER
+    from webapp.reload import init_reload
+    from webapp.routes import bp
 
-@app.cli.command()
-def init_db():
-    db.create_all()
-    for key in app.config["DATA_LOAD_CONFIG"].keys():
-        FiletoDbHandler(db, key)()
+    configure_logging(app)
+    init_assets(app)
+    init_metrics(app)
+    PARSING_CACHE.init_app(app)
+    PLACE_NAMES_SPELLER.init_app(app)
+    QUESTION_TEMPLATES.init_app(app)
+    ADMISSION.init_app(app)
+    ANSWER_CACHE.init_app(app)
+    QUERY_COUNTER.init_app(app)
+    init_reload(app)
+    app.register_blueprint(bp)
+    app.register_blueprint(admin_bp)
+    app.cli.add_command(init_db)
+    app.cli.add_command(upgrade_db)
+    app.cli.add_command(build_static_assets)
+    app.cli.add_command(build_lexicon)
+    app.cli.add_command(build_wiki_store)
+    app.cli.add_command(reload_lexicon)
+    return app
 
 
+def __getattr__(name):
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    if name == "FiletoDbHandler":
+        from webapp.word_files_handler.initial_data_handlers import FiletoDbHandler
+        return FiletoDbHandler
+    if name == "load_words_to_db":
+        from webapp.word_files_handler.initial_data_handlers import load_words_to_db
+        return load_words_to_db
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
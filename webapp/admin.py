@@ -0,0 +1,35 @@
+"""
+Administration endpoints, allowed to requests whose X-Admin-Token header matches ADMIN_TOKEN
+"""
+import hmac
+
+from flask import Blueprint, abort, current_app, jsonify, request
+
+from webapp.reload import LEXICON_RELOADER, hot_reload_supported
+
+bp = Blueprint("admin", __name__, url_prefix="/admin")
+
+
+@bp.before_request
+def check_token():
+    token = current_app.config.get("ADMIN_TOKEN", "")
+    if not token:
+        abort(404)
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", "").encode("utf-8"), token.encode("utf-8")):
+        abort(403)
+
+
+@bp.route("/lexicon")
+def lexicon_status():
+    return jsonify(LEXICON_RELOADER.status())
+
+
+@bp.route("/lexicon/reload", methods=["POST"])
+def reload_lexicon():
+    app = current_app._get_current_object()
+    if not hot_reload_supported(app):
+        # rewriting database words would hold a write lock in a worker serving requests
+        error = "hot reload needs memory or artifact backend, run flask reload-lexicon with database backend"
+        return jsonify(dict(LEXICON_RELOADER.status(), started=False, error=error)), 409
+    started = LEXICON_RELOADER.reload(app)
+    return jsonify(dict(LEXICON_RELOADER.status(), started=started)), 202 if started else 409
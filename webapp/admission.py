@@ -0,0 +1,189 @@
+"""
+Admission control of /process. A worker runs a bounded number of searches at once, others wait in
+a bounded queue for a bounded time and are shed with a 503 and Retry-After, unless a recent answer
+to the same question can be served.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from werkzeug.exceptions import ServiceUnavailable
+
+from webapp.metrics import METRICS
+from webapp.parser.cache import normalize_question
+from webapp.signals import lexicon_changed
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Overloaded(ServiceUnavailable):
+    """
+    raised when a request is shed, reason is "queue_full" or "timeout"
+    """
+
+    def __init__(self, reason, retry_after=None):
+        super().__init__(description="Too many searches in progress, retry later.", retry_after=retry_after)
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded wait queue and a maximum queue time
+    """
+
+    def __init__(self, max_concurrency=4, max_queue=16, max_wait=2.0, retry_after=5):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "timeout": 0}
+        self._condition = threading.Condition()
+
+    def init_app(self, app):
+        """
+        configure limits with ADMISSION_* app config
+        """
+        self.max_concurrency = app.config.get("ADMISSION_MAX_CONCURRENCY", 4)
+        self.max_queue = app.config.get("ADMISSION_MAX_QUEUE", 16)
+        self.max_wait = app.config.get("ADMISSION_MAX_WAIT", 2.0)
+        self.retry_after = app.config.get("ADMISSION_RETRY_AFTER", 5)
+
+    @property
+    def saturated(self):
+        """
+        True when a new request would have to wait for a slot
+        """
+        return 0 < self.max_concurrency <= self.active or self.waiting > 0
+
+    def _reject(self, reason):
+        self.shed[reason] += 1
+        LOGGER.warning(" Request shed (%s): %s active, %s waiting", reason, self.active, self.waiting)
+        raise Overloaded(reason, retry_after=self.retry_after)
+
+    def acquire(self):
+        """
+        take a slot, waiting at most max_wait seconds
+        :raise Overloaded: if the queue is full or the wait is too long
+        """
+        with self._condition:
+            if self.active < self.max_concurrency and not self.waiting:
+                self.active += 1
+                self.admitted += 1
+                return
+            if self.waiting >= self.max_queue:
+                self._reject("queue_full")
+            self.waiting += 1
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while self.active >= self.max_concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject("timeout")
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def admit(self):
+        """
+        context manager running its block in a slot, does nothing when max_concurrency is 0
+        :raise Overloaded: if the request is shed
+        """
+        if self.max_concurrency <= 0:
+            yield
+            return
+        with METRICS.stage("admission_wait"):
+            self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class AnswerCache:
+    """
+    Last answers of /process by normalized question, served instead of queuing when all slots are taken
+    and when a request is shed.
+    Entries expire after ttl seconds and are dropped each time the lexicon changes.
+    """
+
+    def __init__(self, maxsize=512, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.served = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        lexicon_changed.connect(self._on_lexicon_changed)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _on_lexicon_changed(self, sender, **kwargs):
+        self.clear()
+
+    def init_app(self, app):
+        """
+        size cache with ANSWER_CACHE_SIZE and ANSWER_CACHE_TTL app config
+        """
+        self.maxsize = app.config.get("ANSWER_CACHE_SIZE", 512)
+        self.ttl = app.config.get("ANSWER_CACHE_TTL", 3600)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def put(self, in_string, results):
+        """
+        :param in_string: user question
+        :param results: api results of this question
+        """
+        if self.maxsize <= 0:
+            return
+        key = normalize_question(in_string)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, in_string):
+        """
+        :param in_string: user question
+        :return: api results of this question or None if there are none or they expired
+        """
+        key = normalize_question(in_string)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self.served += 1
+            return entry[1]
+
+
+ADMISSION = AdmissionController()
+ANSWER_CACHE = AnswerCache()
+METRICS.add_value("admission_active", "Searches in progress.", lambda: ADMISSION.active)
+METRICS.add_value("admission_queue_depth", "Searches waiting for a slot.", lambda: ADMISSION.waiting)
+METRICS.add_value("admission_admitted_total", "Searches admitted.", lambda: ADMISSION.admitted, kind="counter")
+METRICS.add_value("admission_shed_queue_full_total", "Searches shed because the queue was full.",
+                  lambda: ADMISSION.shed["queue_full"], kind="counter")
+METRICS.add_value("admission_shed_timeout_total", "Searches shed after waiting too long.",
+                  lambda: ADMISSION.shed["timeout"], kind="counter")
+METRICS.add_value("answer_cache_served_total", "Shed searches answered from answer cache.",
+                  lambda: ANSWER_CACHE.served, kind="counter")
@@ -2,11 +2,13 @@
 Module that contains all api connectors
 """
 import logging
+import threading
 
-import requests
-from bs4 import BeautifulSoup
+from flask import current_app, has_app_context
+
+from config import GOOGLE_MAPS_API_URL, WIKIPEDIA_API_URL
+from webapp.metrics import METRICS
 
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 
 try:
@@ -16,6 +18,30 @@ except ImportError as import_error:
     Create an api_keys.txt module in project root and store your api keys""", import_error)
 
 
+_local = threading.local()
+
+
+def get_session():
+    """
+    connection pools are kept per thread of a worker, see reset_sessions after a fork
+    :return: requests session of current thread
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        # imported on first call, requests and bs4 are the slowest imports of the app
+        import requests
+        session = _local.session = requests.Session()
+    return session
+
+
+def reset_sessions():
+    """
+    forget sessions, connections inherited from another process must not be shared
+    """
+    global _local
+    _local = threading.local()
+
+
 class ApiConnector(object):
     """
     Default class to represent element for calling an API
@@ -30,7 +56,7 @@ class ApiConnector(object):
         call api with search url
         :return: api response
         """
-        response = requests.get(self.get_search_url())
+        response = get_session().get(self.get_search_url())
         return response.json()
 
     def get_search_url(self, **kwargs):
@@ -45,7 +71,7 @@ class GoogleMapsApiConnector(ApiConnector):
     """
     Google Maps Api connector
     """
-    root_url = "https://maps.googleapis.com/maps/api/geocode/json?address=%s&key=%s"
+    root_url = GOOGLE_MAPS_API_URL + "?address=%s&key=%s"
 
     def search(self):
         """
@@ -64,7 +90,8 @@ class GoogleMapsApiConnector(ApiConnector):
             return new_response
 
         LOGGER.info(" Getting Google maps data for %s", self.search_term)
-        response = super(GoogleMapsApiConnector, self).search()
+        with METRICS.stage("google_maps"):
+            response = super(GoogleMapsApiConnector, self).search()
         if response['status'] == 'ZERO_RESULTS':
             return new_response
         new_response = {
@@ -85,8 +112,26 @@ class WikipediaApiConnector(ApiConnector):
     """
     Wikipedia Api Connector
     """
-    opensearch_url = "https://fr.wikipedia.org/w/api.php?action=opensearch&search=%s&format=json"
-    root_url = "https://fr.wikipedia.org/w/api.php?action=query&titles=%s&prop=extracts&format=json"
+    opensearch_url = WIKIPEDIA_API_URL + "?action=opensearch&search=%s&format=json"
+    root_url = WIKIPEDIA_API_URL + "?action=query&titles=%s&prop=extracts&format=json"
+
+    def __init__(self, search_term, store=None):
+        super(WikipediaApiConnector, self).__init__(search_term)
+        self.store = store if store is not None else self._configured_store()
+
+    @staticmethod
+    def _configured_store():
+        """
+        :return: local extracts store when WIKIPEDIA_MODE is "store" and WIKIPEDIA_STORE exists, else None
+        """
+        if not has_app_context() or current_app.config.get("WIKIPEDIA_MODE", "api") != "store":
+            return None
+        from webapp.api_connectors.wiki_store import get_wiki_store
+        try:
+            return get_wiki_store(current_app.config["WIKIPEDIA_STORE"])
+        except (OSError, ValueError) as error:
+            LOGGER.warning(" Wikipedia store unavailable, using api: %s", error)
+            return None
 
     def get_search_url(self, **kwargs):
         """
@@ -104,7 +149,8 @@ class WikipediaApiConnector(ApiConnector):
         :return: a new search term
         """
         LOGGER.info("Launch opensearch of %s in wikipedia api", self.search_term)
-        result = requests.get(self.get_search_url()).json()
+        with METRICS.stage("wikipedia_opensearch"):
+            result = get_session().get(self.get_search_url()).json()
         try:
             return result[1][0], result[3][0]
         except IndexError as index_error:
@@ -122,6 +168,12 @@ class WikipediaApiConnector(ApiConnector):
                 "url": ""
             }
 
+        if self.store is not None:
+            with METRICS.stage("wikipedia_store"):
+                record = self.store.get(self.search_term)
+            if record is not None:
+                return record
+
         query_term, article_url = self._opensearch()
         if  query_term is None:
             return {
@@ -131,10 +183,13 @@ class WikipediaApiConnector(ApiConnector):
             }
 
         LOGGER.info("Launch query of %s in wikipedia api", query_term)
-        response = requests.get(self.get_search_url(query_term=query_term)).json()
+        with METRICS.stage("wikipedia_query"):
+            response = get_session().get(self.get_search_url(query_term=query_term)).json()
         pages = response['query']['pages']
         page = [p for p in pages.keys()][0]
-        soup = BeautifulSoup(pages[page]['extract'], "html.parser")
+        from bs4 import BeautifulSoup
+        with METRICS.stage("html_parsing"):
+            soup = BeautifulSoup(pages[page]['extract'], "html.parser")
         try:
             description = [p for p in soup.find_all("p")][0]
             if len(description) == 0:
@@ -0,0 +1,83 @@
+"""
+tests for local wikipedia extracts store
+"""
+import bz2
+import json
+
+import requests_mock
+
+from webapp.api_connectors.connectors import WikipediaApiConnector
+from webapp.api_connectors.wiki_store import WikiExtractStore, build_store, first_paragraph, iter_dump_pages
+
+DUMP = """<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/" xml:lang="fr">
+  <siteinfo><sitename>Wikipédia</sitename></siteinfo>
+  <page><title>Paris</title><ns>0</ns><id>1</id><revision><text xml:space="preserve">{{Infobox Commune
+| nom = Paris {{lang|fr|Paris}}
+}}
+[[Fichier:Paris.jpg|vignette|La [[tour Eiffel]].]]
+'''Paris''' est la [[capitale de la France|capitale]] de la [[France]].&lt;ref&gt;INSEE&lt;/ref&gt;
+
+== Histoire ==
+Lutèce.</text></revision></page>
+  <page><title>Lutèce</title><ns>0</ns><id>2</id><redirect title="Paris" /><revision><text>#REDIRECTION [[Paris]]</text></revision></page>
+  <page><title>Modèle:Infobox</title><ns>10</ns><id>3</id><revision><text>Un modèle qui ne sera pas gardé.</text></revision></page>
+  <page><title>Saint-Étienne</title><ns>0</ns><id>4</id><revision><text>'''Saint-Étienne''' est une commune française de la [[Loire (département)|Loire]].</text></revision></page>
+  <page><title>Aix-en-Provence</title><ns>0</ns><id>5</id><revision><text>'''Aix-en-Provence''' est une commune du sud de la France.</text></revision></page>
+  <page><title>Vide</title><ns>0</ns><id>6</id><revision><text>{{Ébauche}}</text></revision></page>
+</mediawiki>
+"""
+
+
+def write_dump(tmp_path):
+    dump_path = str(tmp_path / "frwiki-pages-articles.xml.bz2")
+    with open(dump_path, "wb") as dump_file:
+        dump_file.write(bz2.compress(DUMP.encode("utf-8")))
+    return dump_path
+
+
+def build(tmp_path):
+    store_path = str(tmp_path / "wikipedia.store")
+    count = build_store(write_dump(tmp_path), store_path, chunk_size=2)
+    return count, WikiExtractStore(store_path)
+
+
+def test_iter_dump_pages(tmp_path):
+    titles = [title for title, text in iter_dump_pages(write_dump(tmp_path))]
+    assert titles == ["Paris", "Saint-Étienne", "Aix-en-Provence", "Vide"]
+
+
+def test_first_paragraph():
+    assert first_paragraph("{{Infobox|a={{b}}}}\n'''Paris''' est la [[capitale de la France|capitale]] "
+                           "de la [[France]].<ref name=\"a\">INSEE</ref>") == \
+        "Paris est la capitale de la France."
+    assert first_paragraph("{{Ébauche}}\n== Section ==\n* liste") == ""
+
+
+def test_store(tmp_path):
+    count, store = build(tmp_path)
+    assert count == 3
+    assert store.get("paris") == {
+        "title": "Paris",
+        "description": "<p>Paris est la capitale de la France.</p>",
+        "url": "https://fr.wikipedia.org/wiki/Paris",
+    }
+    assert store.get("Saint-Etienne")["url"] == "https://fr.wikipedia.org/wiki/Saint-%C3%89tienne"
+    assert store.get("Aix-en-Provence")["title"] == "Aix-en-Provence"
+    assert store.get("Lutèce") is None
+    assert store.get("Vide") is None
+    store.close()
+
+
+@requests_mock.Mocker(kw="mock")
+def test_connector_store_mode(tmp_path, **kwargs):
+    count, store = build(tmp_path)
+    assert WikipediaApiConnector("Paris", store=store).search()["title"] == "Paris"
+    assert kwargs["mock"].call_count == 0
+
+    connector = WikipediaApiConnector("Budapest", store=store)
+    kwargs["mock"].get(connector.get_search_url(), text=json.dumps(
+        ["Budapest", ["Budapest"], [""], ["https://fr.wikipedia.org/wiki/Budapest"]]))
+    kwargs["mock"].get(connector.get_search_url(query_term="Budapest"), text=json.dumps(
+        {"query": {"pages": {"1": {"title": "Budapest", "extract": "<p>Capitale de la Hongrie</p>"}}}}))
+    assert connector.search()["description"] == "<p>Capitale de la Hongrie</p>"
+    assert kwargs["mock"].call_count == 2
@@ -0,0 +1,258 @@
+"""
+Offline store of Wikipedia extracts, built from a pages-articles dump (bz2 XML) and read through mmap.
+
+The dump is streamed: first paragraphs of articles are extracted page by page, sorted in bounded
+chunks written to temporary run files, then merged. The store holds the records sorted by normalized
+title followed by an index of their offsets, so a title is found by binary search without loading it.
+
+Layout: magic (4 bytes), format version (uint16), records count (uint32), index offset (uint64),
+records (uint32 length + key, title, url and extract separated by \\x1f), index (uint64 offsets).
+"""
+import bz2
+import heapq
+import html
+import logging
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from functools import lru_cache
+from urllib.parse import quote
+
+from webapp.parser.matchers import normalize_key
+
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"GPWK"
+FORMAT_VERSION = 1
+HEADER = struct.Struct(">4sHIQ")
+LENGTH = struct.Struct(">I")
+OFFSET = struct.Struct(">Q")
+SEPARATOR = "\x1f"
+
+FILE_LINK = re.compile(r"\[\[(?:Fichier|File|Image|Catégorie|Category):", re.IGNORECASE)
+COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+REFERENCE = re.compile(r"<ref[^>]*/>|<ref[^>]*>.*?</ref>", re.DOTALL | re.IGNORECASE)
+WIKI_LINK = re.compile(r"\[\[(?:[^|\]]*\|)?([^\]]*)\]\]")
+EXTERNAL_LINK = re.compile(r"\[(?:https?:)?//[^\s\]]+\s*([^\]]*)\]")
+TAG = re.compile(r"<[^>]+>")
+EMPHASIS = re.compile(r"'{2,}")
+SPACES = re.compile(r"\s+")
+# lines of lists, headings, tables and indented blocks are not paragraphs
+NOT_PARAGRAPH = ("=", "*", "#", ":", ";", "|", "!", "{", "}", "__")
+
+
+def _strip_blocks(text, opening, closing, start=None):
+    """
+    remove balanced blocks like {{template {{nested}}}}
+    :param start: compiled regex matching the beginning of blocks to remove, opening by default
+    """
+    pattern = start or re.compile(re.escape(opening))
+    parts = []
+    position = 0
+    match = pattern.search(text, position)
+    while match:
+        parts.append(text[position:match.start()])
+        depth = 0
+        index = match.start()
+        while index < len(text):
+            if text.startswith(opening, index):
+                depth += 1
+                index += len(opening)
+            elif text.startswith(closing, index):
+                depth -= 1
+                index += len(closing)
+                if depth == 0:
+                    break
+            else:
+                index += 1
+        position = index
+        match = pattern.search(text, position)
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def first_paragraph(wikitext, min_length=20):
+    """
+    :param wikitext: article source
+    :return: first paragraph as plain text, or empty string if article has none
+    """
+    text = COMMENT.sub("", wikitext)
+    text = REFERENCE.sub("", text)
+    text = _strip_blocks(text, "{{", "}}")
+    text = _strip_blocks(text, "{|", "|}")
+    text = _strip_blocks(text, "[[", "]]", FILE_LINK)
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line or line.startswith(NOT_PARAGRAPH):
+            continue
+        line = WIKI_LINK.sub(r"\1", line)
+        line = EXTERNAL_LINK.sub(r"\1", line)
+        line = EMPHASIS.sub("", TAG.sub("", line))
+        line = SPACES.sub(" ", html.unescape(line)).strip()
+        if len(line) >= min_length:
+            return line
+    return ""
+
+
+def iter_dump_pages(dump_path):
+    """
+    stream articles of a MediaWiki XML dump, compressed with bz2 or not, in constant memory
+    :return: generator of (title, wikitext) of main namespace pages which are not redirects
+    """
+    opener = bz2.open if dump_path.endswith(".bz2") else open
+    with opener(dump_path, "rb") as dump_file:
+        events = ElementTree.iterparse(dump_file, events=("start", "end"))
+        root = None
+        for event, element in events:
+            if root is None:
+                root = element
+            if event != "end" or element.tag.rsplit("}", 1)[-1] != "page":
+                continue
+            namespace = ""
+            title = text = None
+            redirect = False
+            for child in element.iter():
+                tag = child.tag.rsplit("}", 1)[-1]
+                if tag == "ns":
+                    namespace = child.text
+                elif tag == "title":
+                    title = child.text
+                elif tag == "redirect":
+                    redirect = True
+                elif tag == "text":
+                    text = child.text
+            if namespace == "0" and not redirect and title and text:
+                yield title, text
+            # pages already read are dropped from the tree
+            root.clear()
+
+
+def _write_record(output, fields):
+    data = SEPARATOR.join(fields).encode("utf-8")
+    output.write(LENGTH.pack(len(data)))
+    output.write(data)
+
+
+def _read_records(path):
+    with open(path, "rb") as run_file:
+        while True:
+            header = run_file.read(LENGTH.size)
+            if not header:
+                return
+            yield tuple(run_file.read(LENGTH.unpack(header)[0]).decode("utf-8").split(SEPARATOR))
+
+
+def build_store(dump_path, output_path, base_url="https://fr.wikipedia.org/wiki/", chunk_size=100000, limit=None):
+    """
+    :param dump_path: pages-articles dump path
+    :param output_path: store path, replaced once complete
+    :param base_url: articles url prefix
+    :param chunk_size: records sorted in memory at once
+    :param limit: maximum number of articles stored
+    :return: number of articles stored
+    """
+    work_folder = tempfile.mkdtemp(prefix="wiki-store-", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        runs = []
+        chunk = []
+        for title, text in iter_dump_pages(dump_path):
+            extract = first_paragraph(text)
+            if not extract:
+                continue
+            chunk.append((normalize_key(title), title, base_url + quote(title.replace(" ", "_")), extract))
+            if len(chunk) >= chunk_size:
+                runs.append(_write_run(sorted(chunk), work_folder, len(runs)))
+                chunk = []
+            if limit is not None and len(runs) * chunk_size + len(chunk) >= limit:
+                break
+        runs.append(_write_run(sorted(chunk), work_folder, len(runs)))
+
+        count = 0
+        previous_key = None
+        offsets_path = os.path.join(work_folder, "offsets")
+        temporary_path = os.path.join(work_folder, "store")
+        with open(temporary_path, "wb") as output, open(offsets_path, "wb") as offsets:
+            output.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0))
+            for record in heapq.merge(*[_read_records(run) for run in runs]):
+                if record[0] == previous_key:
+                    continue
+                previous_key = record[0]
+                offsets.write(OFFSET.pack(output.tell()))
+                _write_record(output, record)
+                count += 1
+            index_offset = output.tell()
+            offsets.close()
+            with open(offsets_path, "rb") as offsets_file:
+                shutil.copyfileobj(offsets_file, output)
+            output.seek(0)
+            output.write(HEADER.pack(MAGIC, FORMAT_VERSION, count, index_offset))
+        os.replace(temporary_path, output_path)
+        return count
+    finally:
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+
+def _write_run(records, folder, number):
+    path = os.path.join(folder, "run-%s" % number)
+    with open(path, "wb") as run_file:
+        for record in records:
+            _write_record(run_file, record)
+    return path
+
+
+class WikiExtractStore:
+    """
+    Read only access to a store built by build_store
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as store_file:
+            self._map = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self.index_offset = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError("%s is not a wikipedia store of format %s" % (path, FORMAT_VERSION))
+
+    def __len__(self):
+        return self.count
+
+    def _record(self, position):
+        offset = OFFSET.unpack_from(self._map, self.index_offset + position * OFFSET.size)[0]
+        length = LENGTH.unpack_from(self._map, offset)[0]
+        return self._map[offset + LENGTH.size:offset + LENGTH.size + length].decode("utf-8").split(SEPARATOR)
+
+    def get(self, title):
+        """
+        :param title: article title, compared without case nor accents
+        :return: dict with title, description and url, like WikipediaApiConnector results, or None
+        """
+        key = normalize_key(title)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            record = self._record(middle)
+            if record[0] < key:
+                low = middle + 1
+            elif record[0] > key:
+                high = middle
+            else:
+                return {"title": record[1], "description": "<p>%s</p>" % html.escape(record[3]), "url": record[2]}
+        return None
+
+    def close(self):
+        self._map.close()
+
+
+@lru_cache(maxsize=None)
+def get_wiki_store(path):
+    """
+    :return: store opened once per process
+    """
+    store = WikiExtractStore(path)
+    LOGGER.info(" Wikipedia store %s opened with %s articles", path, len(store))
+    return store
@@ -0,0 +1,111 @@
+"""
+Fingerprinted and precompressed static assets.
+build_assets copies static files to hashed file names with gzip and brotli siblings,
+templates url_for then points to these files, served with immutable caching headers.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+from functools import lru_cache
+
+from flask import request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+LOGGER = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+COMPRESSED_EXTENSIONS = (".css", ".js", ".svg", ".html", ".txt")
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+ONE_YEAR = 365 * 24 * 3600
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as out_file:
+        out_file.write(content)
+
+
+def build_assets(static_folder, build_folder):
+    """
+    copy each static file to a name containing a hash of its content, text files
+    also get precompressed .gz and .br (if brotli is installed) siblings
+    :param static_folder: folder of static files
+    :param build_folder: folder where fingerprinted files and manifest are written
+    :return: manifest, a dict mapping static file names to fingerprinted file names
+    """
+    manifest = dict()
+    for root, _, files in os.walk(static_folder):
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            filename = os.path.relpath(source, static_folder).replace(os.sep, "/")
+            with open(source, "rb") as in_file:
+                content = in_file.read()
+            base, extension = os.path.splitext(filename)
+            hashed_filename = "%s.%s%s" % (base, hashlib.sha256(content).hexdigest()[:12], extension)
+            target = os.path.join(build_folder, hashed_filename)
+            _write(target, content)
+            if extension in COMPRESSED_EXTENSIONS:
+                _write(target + ".gz", gzip.compress(content, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    _write(target + ".br", brotli.compress(content))
+            manifest[filename] = hashed_filename
+
+    _write(os.path.join(build_folder, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    load_manifest.cache_clear()
+    LOGGER.info(" %s assets built in %s", len(manifest), build_folder)
+    return manifest
+
+
+@lru_cache(maxsize=None)
+def load_manifest(build_folder):
+    """
+    :return: manifest of built assets or an empty dict when assets were not built
+    """
+    try:
+        with open(os.path.join(build_folder, MANIFEST_NAME), "r") as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return dict()
+
+
+def init_assets(app):
+    """
+    register assets route and url_for override of templates on app
+    """
+
+    def asset_url_for(endpoint, **values):
+        """
+        url_for returning fingerprinted file url of a static file when assets were built
+        """
+        if endpoint == "static":
+            hashed_filename = load_manifest(app.config["ASSETS_BUILD_FOLDER"]).get(values.get("filename"))
+            if hashed_filename is not None:
+                values["filename"] = hashed_filename
+                return url_for("assets", **values)
+        return url_for(endpoint, **values)
+
+    @app.route("/assets/<path:filename>")
+    def assets(filename):
+        build_folder = app.config["ASSETS_BUILD_FOLDER"]
+        mimetype = mimetypes.guess_type(filename)[0]
+        for encoding, suffix in ENCODINGS:
+            if encoding in request.accept_encodings and os.path.isfile(os.path.join(build_folder, filename + suffix)):
+                response = send_from_directory(build_folder, filename + suffix, mimetype=mimetype)
+                response.headers["Content-Encoding"] = encoding
+                break
+        else:
+            response = send_from_directory(build_folder, filename, mimetype=mimetype)
+        response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.max_age = ONE_YEAR
+        response.cache_control.immutable = True
+        return response
+
+    app.jinja_env.globals["url_for"] = asset_url_for
@@ -0,0 +1,90 @@
+"""
+Flask CLI commands, registered by create_app
+"""
+import os
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from webapp import db
+
+
+@click.command("init-db")
+@with_appcontext
+def init_db():
+    """
+    create tables and load DATA_LOAD_CONFIG files in an empty database
+    """
+    from webapp.models import Word
+    from webapp.word_files_handler.initial_data_handlers import load_words_to_db
+    db.create_all()
+    if db.session.query(Word.id).first() is not None:
+        # words would be added a second time
+        raise click.ClickException("database already holds words: run flask upgrade-db after a schema change, "
+                                   "flask reload-lexicon to replace words")
+    load_words_to_db(db, current_app.config["DATA_LOAD_CONFIG"])
+
+
+@click.command("upgrade-db")
+@with_appcontext
+def upgrade_db():
+    """
+    add columns and tables of the current schema to a database created by an earlier version
+    """
+    from webapp.word_files_handler.initial_data_handlers import upgrade_schema
+    filled = upgrade_schema(db)
+    click.echo("%s word keys filled" % filled)
+
+
+@click.command("build-static-assets")
+@with_appcontext
+def build_static_assets():
+    from webapp.assets import build_assets
+    build_assets(current_app.static_folder, current_app.config["ASSETS_BUILD_FOLDER"])
+
+
+@click.command("build-lexicon")
+@click.option("--output", default=None, help="artifact path, LEXICON_ARTIFACT by default")
+@with_appcontext
+def build_lexicon(output):
+    """
+    compile DATA_LOAD_CONFIG categories and spelling index in a lexicon artifact
+    """
+    from webapp.parser.artifact import build_artifact
+    config = current_app.config
+    output = output or config["LEXICON_ARTIFACT"]
+    artifact = build_artifact(config["DATA_LOAD_CONFIG"], tuple(config.get("SPELLING_CATEGORIES", ())),
+                              config.get("SPELLING_MAX_DISTANCE", 2))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    artifact.save(output)
+    click.echo("%s: %s words, %s bytes, built in %.1f s" % (
+        output, artifact.description["words"], os.path.getsize(output), artifact.description["build_duration"]))
+
+
+@click.command("build-wiki-store")
+@click.argument("dump", type=click.Path(exists=True, dir_okay=False))
+@click.option("--output", default=None, help="store path, WIKIPEDIA_STORE by default")
+@click.option("--limit", type=int, default=None, help="maximum number of articles")
+@with_appcontext
+def build_wiki_store(dump, output, limit):
+    """
+    extract first paragraphs of a frwiki pages-articles dump (.xml or .xml.bz2) in a local store
+    """
+    from webapp.api_connectors.wiki_store import build_store
+    output = output or current_app.config["WIKIPEDIA_STORE"]
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    count = build_store(dump, output, limit=limit)
+    click.echo("%s: %s articles, %s bytes" % (output, count, os.path.getsize(output)))
+
+
+@click.command("reload-lexicon")
+@with_appcontext
+def reload_lexicon():
+    """
+    replace lexicon words by words of DATA_LOAD_CONFIG files, running workers follow within
+    LEXICON_RELOAD_CHECK_INTERVAL seconds. With database backend, lookups wait for the rewrite to commit
+    """
+    from webapp.reload import LEXICON_RELOADER
+    LEXICON_RELOADER.reload(current_app._get_current_object(), wait=True)
+    click.echo(LEXICON_RELOADER.status())
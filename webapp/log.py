@@ -0,0 +1,91 @@
+"""
+Logging configured once from app config. Records are handed to a queue and written by a
+background thread, debug traces of hot paths are guarded and can be sampled.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+
+DEBUG_SAMPLING = {"rate": 1.0}
+_trace_sampled = contextvars.ContextVar("trace_sampled", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one json object per line
+    """
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def start_trace():
+    """
+    decide if debug traces of current request are kept, according to LOG_DEBUG_SAMPLE_RATE
+    """
+    _trace_sampled.set(random.random() < DEBUG_SAMPLING["rate"])
+
+
+def debug_enabled(logger):
+    """
+    guard of hot path debug logs: arguments should only be built when this returns True
+    :param logger: logger used
+    :return: True if logger emits debug records and current trace is sampled
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    sampled = _trace_sampled.get()
+    if sampled is None:
+        return random.random() < DEBUG_SAMPLING["rate"]
+    return sampled
+
+
+def configure_logging(app):
+    """
+    configure root logger from LOG_LEVEL, LOG_FORMAT, LOG_DEBUG_SAMPLE_RATE and LOG_QUEUE app config
+    :return: the queue listener writing records or None
+    """
+    previous_listener = app.extensions.pop("log_listener", None)
+    if previous_listener is not None:
+        atexit.unregister(previous_listener.stop)
+        previous_listener.stop()
+
+    DEBUG_SAMPLING["rate"] = app.config.get("LOG_DEBUG_SAMPLE_RATE", 1.0)
+    handler = logging.StreamHandler(sys.stderr)
+    if app.config.get("LOG_FORMAT") == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s:%(message)s"))
+
+    root = logging.getLogger()
+    for previous_handler in list(root.handlers):
+        root.removeHandler(previous_handler)
+    root.setLevel(app.config.get("LOG_LEVEL", "INFO"))
+
+    listener = None
+    if app.config.get("LOG_QUEUE", True):
+        log_queue = queue.SimpleQueue()
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        app.extensions["log_listener"] = listener
+    else:
+        root.addHandler(handler)
+
+    if start_trace not in app.before_request_funcs.get(None, []):
+        app.before_request(start_trace)
+    return listener
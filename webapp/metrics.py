@@ -0,0 +1,156 @@
+"""
+Latency measures of each stage of a search. Durations of the current request are sent in
+Server-Timing header and aggregated in histograms exposed in prometheus text format at /metrics.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """
+    Cumulative histogram of values, durations in seconds with default buckets
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def cumulative_counts(self):
+        """
+        :return: list of (upper bound, number of values lower than bound) tuples, last bound is +Inf
+        """
+        results = []
+        total = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            results.append((bound, total))
+        return results
+
+
+class Metrics:
+    """
+    Registry of stage histograms, of other histograms and of values read when metrics are exported
+    """
+
+    def __init__(self, prefix="grandpy", enabled=True):
+        self.prefix = prefix
+        self.enabled = enabled
+        self.stages = dict()
+        self.values = list()
+        self.histograms = list()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        context manager measuring duration of a stage
+        :param name: stage name
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, duration):
+        """
+        add a stage duration to its histogram and to current request timings
+        :param name: stage name
+        :param duration: duration in seconds
+        """
+        histogram = self.stages.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stages.setdefault(name, Histogram())
+        histogram.observe(duration)
+        if has_request_context():
+            timings = g.setdefault("stage_timings", dict())
+            timings[name] = timings.get(name, 0) + duration
+
+    def add_value(self, name, help_text, getter, kind="gauge"):
+        """
+        register a value read at export time
+        :param name: metric name without prefix
+        :param help_text: metric description
+        :param getter: callable returning metric value
+        :param kind: prometheus metric type, gauge or counter
+        """
+        self.values.append((name, help_text, getter, kind))
+
+    def add_histogram(self, name, help_text, histogram):
+        """
+        register a histogram filled by its owner
+        :param name: metric name without prefix
+        :param help_text: metric description
+        :param histogram: a Histogram instance
+        """
+        self.histograms.append((name, help_text, histogram))
+
+    def server_timing(self, timings):
+        """
+        :param timings: dict of stage durations in seconds
+        :return: Server-Timing header value
+        """
+        return ", ".join("%s;dur=%.2f" % (name, duration * 1000) for name, duration in timings.items())
+
+    def render(self):
+        """
+        :return: all metrics in prometheus text format
+        """
+        name = "%s_stage_duration_seconds" % self.prefix
+        lines = ["# HELP %s Duration of search stages." % name, "# TYPE %s histogram" % name]
+        for stage, histogram in sorted(self.stages.items()):
+            for bound, count in histogram.cumulative_counts():
+                lines.append('%s_bucket{stage="%s",le="%s"} %d' % (name, stage, bound, count))
+            lines.append('%s_sum{stage="%s"} %.6f' % (name, stage, histogram.sum))
+            lines.append('%s_count{stage="%s"} %d' % (name, stage, sum(histogram.counts)))
+        for histogram_name, help_text, histogram in self.histograms:
+            histogram_name = "%s_%s" % (self.prefix, histogram_name)
+            lines += ["# HELP %s %s" % (histogram_name, help_text), "# TYPE %s histogram" % histogram_name]
+            for bound, count in histogram.cumulative_counts():
+                lines.append('%s_bucket{le="%s"} %d' % (histogram_name, bound, count))
+            lines.append("%s_sum %s" % (histogram_name, histogram.sum))
+            lines.append("%s_count %d" % (histogram_name, sum(histogram.counts)))
+        for value_name, help_text, getter, kind in self.values:
+            value_name = "%s_%s" % (self.prefix, value_name)
+            lines += ["# HELP %s %s" % (value_name, help_text), "# TYPE %s %s" % (value_name, kind),
+                      "%s %s" % (value_name, getter())]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def init_metrics(app):
+    """
+    register Server-Timing header and /metrics route on app
+    """
+    METRICS.enabled = app.config.get("METRICS_ENABLED", True)
+
+    @app.after_request
+    def add_server_timing(response):
+        timings = g.get("stage_timings")
+        if timings:
+            response.headers["Server-Timing"] = METRICS.server_timing(timings)
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
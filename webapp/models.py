@@ -11,7 +11,8 @@ class WordType(db.Model):
     """
     id = db.Column(db.Integer, primary_key=True)
     type_name = db.Column(db.String(200), nullable=False)
-    word_type = db.relationship("Word", backref="word_type", lazy=True)
+    # never loaded implicitly: code reading words of a category queries the columns it needs in one statement
+    word_type = db.relationship("Word", backref=db.backref("word_type", lazy="raise"), lazy="raise")
 
 
 class Word(db.Model):
@@ -20,6 +21,30 @@ class Word(db.Model):
     """
     id = db.Column(db.Integer, primary_key=True)
     word = db.Column(db.String(200), nullable=False)
+    # casefolded word without accents, see webapp.parser.matchers.normalize_key
+    key = db.Column(db.String(200), nullable=False)
     category = db.Column(db.Integer, db.ForeignKey("word_type.id"), nullable=False)
     category_word_index = db.Index("cat_word_idx", category, word)
     word_index = db.Index("word_idx", word)
+    key_index = db.Index("key_idx", key)
+
+
+class LexiconEntry(db.Model):
+    """
+    One row per normalized word of Word table with the categories it belongs to: bit n - 1 of
+    categories is set for WordType n. It is rebuilt from Word table each time words are loaded
+    (see webapp.word_files_handler.initial_data_handlers.rebuild_lexicon_entries) and lets lexicon
+    lookups probe primary key without join.
+    """
+    # on SQLite rows are stored in primary key b-tree: a lookup is one probe, without rowid indirection
+    __table_args__ = {"sqlite_with_rowid": False}
+    key = db.Column(db.String(200), primary_key=True)
+    categories = db.Column(db.Integer, nullable=False)
+
+
+def category_bit(category_id):
+    """
+    :param category_id: WordType id, from 1 to 31
+    :return: bit of this category in LexiconEntry.categories
+    """
+    return 1 << (category_id - 1)
@@ -0,0 +1,156 @@
+"""
+Prebuilt lexicon artifact: a single file holding the memory lexicon and the spelling index of all
+DATA_LOAD_CONFIG categories, loaded by workers instead of parsing data files or querying the database.
+
+Layout: magic (4 bytes), format version (uint16), marshal version (uint16), python major and minor
+versions (2 uint8), payload length (uint64), sha256 of payload (32 bytes), payload. The payload is a zlib
+compressed marshal dump of builtin types only: marshal format is only guaranteed within a python version,
+artifacts built by another one are rejected and the lexicon is rebuilt from data files.
+"""
+import gc
+import hashlib
+import marshal
+import os
+import struct
+import sys
+import time
+import zlib
+
+from webapp.parser.lexicon import MemoryLexicon
+from webapp.parser.matchers import DeletionIndex
+
+MAGIC = b"GPLX"
+FORMAT_VERSION = 2
+# magic and format version, read first as the rest of the header depends on the format version
+PREFIX = struct.Struct(">4sH")
+HEADER = struct.Struct(">4sHHBBQ32s")
+PYTHON_VERSION = tuple(sys.version_info[:2])
+
+
+class ArtifactError(ValueError):
+    """
+    raised when an artifact is truncated, corrupted, of another format version or built by another python version
+    """
+
+
+class LexiconArtifact:
+    """
+    Content of an artifact: lexicon, optional spelling index and build description.
+    Categories of a loaded lexicon are tuples, words can't be added to it.
+    """
+
+    def __init__(self, lexicon, spelling_index=None, spelling_categories=(), description=None):
+        self.lexicon = lexicon
+        self.spelling_index = spelling_index
+        self.spelling_categories = tuple(spelling_categories)
+        self.description = description or dict()
+
+    def spelling_index_for(self, categories, max_distance):
+        """
+        :return: prebuilt spelling index if it was built for these categories and distance, or None
+        """
+        index = self.spelling_index
+        if index is None or self.spelling_categories != tuple(categories) or index.max_distance != max_distance:
+            return None
+        return index
+
+    def dumps(self):
+        """
+        :return: artifact bytes
+        """
+        content = {
+            "description": dict(self.description, created=self.description.get("created", time.time())),
+            # tuples are much faster to unmarshal than sets
+            "categories": {key: tuple(categories) for key, categories in self.lexicon.categories.items()},
+            "surfaces": self.lexicon.surfaces,
+            "spelling": None,
+        }
+        if self.spelling_index is not None:
+            content["spelling"] = {
+                "categories": self.spelling_categories,
+                "max_distance": self.spelling_index.max_distance,
+                "prefix_length": self.spelling_index.prefix_length,
+                "words": self.spelling_index.words,
+                "deletes": self.spelling_index.deletes,
+            }
+        payload = zlib.compress(marshal.dumps(content), 6)
+        return HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version, *PYTHON_VERSION, len(payload),
+                           hashlib.sha256(payload).digest()) + payload
+
+    @classmethod
+    def loads(cls, data):
+        """
+        :param data: artifact bytes
+        :raise ArtifactError: if data is not a valid artifact of current format version, marshal version
+        and python version
+        """
+        if len(data) < PREFIX.size:
+            raise ArtifactError("truncated artifact header")
+        magic, version = PREFIX.unpack_from(data)
+        if magic != MAGIC:
+            raise ArtifactError("not a lexicon artifact")
+        if version != FORMAT_VERSION:
+            raise ArtifactError("artifact format %s, expected %s" % (version, FORMAT_VERSION))
+        if len(data) < HEADER.size:
+            raise ArtifactError("truncated artifact header")
+        _, _, marshal_version, major, minor, length, checksum = HEADER.unpack_from(data)
+        if marshal_version != marshal.version:
+            raise ArtifactError("artifact marshal version %s, expected %s" % (marshal_version, marshal.version))
+        if (major, minor) != PYTHON_VERSION:
+            raise ArtifactError("artifact built by python %s.%s, expected %s.%s" % ((major, minor) + PYTHON_VERSION))
+        payload = data[HEADER.size:]
+        if len(payload) != length:
+            raise ArtifactError("truncated artifact payload")
+        if hashlib.sha256(payload).digest() != checksum:
+            raise ArtifactError("artifact checksum mismatch")
+        # content holds only containers of strings, collections triggered by its allocations would find nothing
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            content = marshal.loads(zlib.decompress(payload))
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        lexicon = MemoryLexicon()
+        lexicon.categories = content["categories"]
+        lexicon.surfaces = content["surfaces"]
+        spelling = content["spelling"]
+        if spelling is None:
+            return cls(lexicon, description=content["description"])
+        index = DeletionIndex((), max_distance=spelling["max_distance"], prefix_length=spelling["prefix_length"])
+        index.words = spelling["words"]
+        index.deletes = spelling["deletes"]
+        return cls(lexicon, index, spelling["categories"], content["description"])
+
+    def save(self, path):
+        """
+        write artifact next to path then rename it, so that a running worker never reads a partial file
+        """
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as artifact_file:
+            artifact_file.write(self.dumps())
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as artifact_file:
+            return cls.loads(artifact_file.read())
+
+
+def build_artifact(data_load_config, spelling_categories=("cities", "countries"), max_distance=2):
+    """
+    :param data_load_config: categories loaded with their handler methods
+    :return: a LexiconArtifact
+    """
+    start = time.perf_counter()
+    lexicon = MemoryLexicon.from_data_files(data_load_config)
+    index = None
+    if max_distance > 0:
+        index = DeletionIndex(lexicon.words(spelling_categories), max_distance=max_distance)
+    description = {
+        "categories": sorted(data_load_config.keys()),
+        "words": len(lexicon),
+        "build_duration": time.perf_counter() - start,
+    }
+    return LexiconArtifact(lexicon, index, spelling_categories, description)
@@ -0,0 +1,109 @@
+"""
+Memoization of parsing results. Questions which only differ by leading blanks or by their final punctuation
+share the same entry, as every parser ignores them. Other characters are kept: results are surface forms
+of the question, parsers rely on capitals, landmarks on apostrophes ("musée d'Orsay") and blanks inside
+the question are kept in multi-word terms.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+from webapp.metrics import METRICS
+from webapp.signals import lexicon_changed
+
+
+def normalize_question(in_string):
+    """
+    Build the canonical form of a question used as cache key
+    :param in_string: user question
+    :return: question without leading blanks, final blanks and final punctuation
+    """
+    return re.sub(r"[\s?!.]+$", "", in_string.lstrip())
+
+
+class ParsingCache:
+    """
+    Bounded LRU memo of parsing results keyed on normalized questions.
+    Entries are dropped each time the lexicon changes.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        lexicon_changed.connect(self._on_lexicon_changed)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _on_lexicon_changed(self, sender, **kwargs):
+        self.clear()
+
+    def init_app(self, app):
+        """
+        size cache with PARSING_CACHE_SIZE app config
+        """
+        self.maxsize = app.config.get("PARSING_CACHE_SIZE", 1024)
+        self.clear()
+
+    def clear(self):
+        """
+        drop all entries, parsing started before this call won't be stored
+        """
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def get(self, in_string, parse, namespace=None):
+        """
+        return memoized parsing result of in_string or compute it with parse
+        :param in_string: user question
+        :param parse: callable taking in_string and returning a list of words
+        :param namespace: separates results of different parsing methods
+        :return: a list of words
+        """
+        if self.maxsize <= 0:
+            return parse(in_string)
+
+        key = (namespace, normalize_question(in_string))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(self._entries[key])
+            self.misses += 1
+            generation = self.generation
+
+        result = parse(in_string)
+
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = tuple(result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return list(result)
+
+    def stats(self):
+        """
+        :return: a dict with cache usage counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "generation": self.generation,
+            }
+
+
+PARSING_CACHE = ParsingCache()
+METRICS.add_value("parsing_cache_hits_total", "Parsing cache hits.", lambda: PARSING_CACHE.hits, kind="counter")
+METRICS.add_value("parsing_cache_misses_total", "Parsing cache misses.", lambda: PARSING_CACHE.misses, kind="counter")
+METRICS.add_value("parsing_cache_size", "Questions stored in parsing cache.", lambda: len(PARSING_CACHE))
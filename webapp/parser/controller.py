@@ -5,13 +5,17 @@ Controller module that calls all parser
 from collections import OrderedDict
 
 import logging
-import re
 
-from webapp.models import Word, WordType
+from flask import current_app, has_app_context
+
+from webapp.log import debug_enabled
+from webapp.metrics import METRICS
+from webapp.parser.lexicon import LEXICONS
+from webapp.parser.matchers import normalize_key, phrase_candidates
 from webapp.parser.parsers import BeforeLinkWorkParser, AfterLinkWorkParser, NonLettersParser, \
-    UniqueLetterParser, StopWordsParser, FrenchWordsParser, CountriesParser, CitiesParser, ExpressionParser
+    UniqueLetterParser, StopWordsParser, FrenchWordsParser, CountriesParser, CitiesParser, ExpressionParser, \
+    PlaceNameParser
 
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 
 
@@ -21,6 +25,7 @@ class ParsingController:
     """
     parsers = [
         (ExpressionParser, 5),
+        (PlaceNameParser, 5),
         (BeforeLinkWorkParser, 2),
         (AfterLinkWorkParser, 0.3),
         (NonLettersParser, 1),
@@ -31,24 +36,54 @@ class ParsingController:
         (CitiesParser, 1.4),
     ]
 
-    def __init__(self, in_string, parsers=None):
+    def __init__(self, in_string, parsers=None, lexicon=None, mode=None):
+        """
+        :param in_string: user question
+        :param parsers: list of (parser class, weight), ParsingController.parsers by default
+        :param lexicon: lexicon used to look words up, LEXICONS.get() by default
+        :param mode: "full" or "pipeline", PARSING_MODE config by default
+        """
         self.in_string = in_string
         if parsers:
             self.parsers = parsers
-        LOGGER.info(" Start parsing: %s", self.in_string)
-        self.database_extract = self.ask_database()
+        self.lexicon = lexicon if lexicon is not None else LEXICONS.get()
+        if mode is None:
+            mode = current_app.config.get("PARSING_MODE", "full") if has_app_context() else "full"
+        self.mode = mode
+        self._database_extract = None
+        LOGGER.debug(" Start parsing: %s", self.in_string)
+        if self.mode == "full":
+            # every parser is launched, lexicon is always needed
+            self._database_extract = self._timed_lookup()
         self.out_list = self._compile_results()
         LOGGER.info(" Parsing finished: %s", self.out_list)
 
+    @property
+    def database_extract(self):
+        """
+        lexicon words of in string, looked up on first access
+        """
+        if self._database_extract is None:
+            self._database_extract = self._timed_lookup()
+        return self._database_extract
+
+    def _timed_lookup(self):
+        with METRICS.stage("lexicon_lookup"):
+            return self.ask_database()
+
     def ask_database(self):
+        """
+        look words of in string up in lexicon, case and accents are ignored
+        :return: a dict with category names as keys and lists of in string words as values
+        """
         word_in_db = dict()
-        tmp_list = self.in_string.split()
-        splited_string = re.split(r" +|'+|\?+|!+|\.+|_+", " ".join(tmp_list))
-        results = Word.query.join(WordType, Word.category == WordType.id).filter(Word.word.in_(splited_string)).all()
-        for res in results:
-            if res.word_type.type_name not in word_in_db.keys():
-                word_in_db[res.word_type.type_name] = list()
-            word_in_db[res.word_type.type_name].append(res.word)
+        words_by_key = dict()
+        for word in phrase_candidates(self.in_string, current_app.config["MAX_PHRASE_TOKENS"]):
+            words_by_key.setdefault(normalize_key(word), []).append(word)
+        for key, category in self.lexicon.lookup(words_by_key):
+            if category not in word_in_db.keys():
+                word_in_db[category] = list()
+            word_in_db[category] += words_by_key[key]
         return word_in_db
 
     def _parser_launcher(self, parser):
@@ -57,7 +92,7 @@ class ParsingController:
         :param parser: parser class
         :return: a list
         """
-        return parser(self.in_string, self.database_extract).out_list
+        return parser(self.in_string, self.database_extract if parser.needs_lexicon else None).out_list
 
     def _paralize_parsing(self):
         parsers_output = []
@@ -66,6 +101,24 @@ class ParsingController:
             parsers_output.append((partial_result, weight))
         return parsers_output
 
+    def _pipeline_parsing(self):
+        """
+        launch parsers from the cheapest and most confident one, stop when a parser whose
+        confidence reaches PARSING_CONFIDENCE_THRESHOLD finds words.
+        Lexicon is not looked up if no parser needing it was launched. Skipped parsers don't weigh
+        on results: only the first term is the same as in "full" mode.
+        :return: a list of (parser output, weight)
+        """
+        threshold = current_app.config["PARSING_CONFIDENCE_THRESHOLD"]
+        parsers_output = []
+        for parser, weight in sorted(self.parsers, key=lambda item: (item[0].cost, -item[0].confidence)):
+            partial_result = self._parser_launcher(parser)
+            parsers_output.append((partial_result, weight))
+            if partial_result and parser.confidence >= threshold:
+                LOGGER.debug(" %s is confident, parsing stopped", parser.__name__)
+                break
+        return parsers_output
+
     def _compile_results(self):
         """
         count number of times a word appear in list
@@ -75,7 +128,12 @@ class ParsingController:
         """
         tmp_dict = dict()
         results = []
-        for partial_result in self._paralize_parsing():
+        with METRICS.stage("parsers"):
+            if self.mode == "pipeline":
+                parsers_output = self._pipeline_parsing()
+            else:
+                parsers_output = self._paralize_parsing()
+        for partial_result in parsers_output:
             for i, value in enumerate(partial_result[0]):
 
                 if value in tmp_dict.keys():
@@ -83,10 +141,10 @@ class ParsingController:
                 else:
                     tmp_dict[value] = (i + 1) / len(partial_result[0]) * partial_result[1]
         tmp_dict = OrderedDict(sorted(tmp_dict.items(), key=lambda x: x[1], reverse=True))
-        LOGGER.debug(" words grades: %s", tmp_dict)
+        if debug_enabled(LOGGER):
+            LOGGER.debug(" words grades: %s", tmp_dict)
         if len(tmp_dict):
             grade_average = sum([value for value in tmp_dict.values()]) / len(tmp_dict)
             results = [key for key, value in tmp_dict.items() if value >= grade_average]
-            LOGGER.debug(" %s", results)
 
         return results
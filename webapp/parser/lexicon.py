@@ -0,0 +1,228 @@
+"""
+Lexicons used by parsing controller to find categories (stop words, cities...) of words.
+DatabaseLexicon queries Word and WordType tables, MemoryLexicon holds the same data in a dict.
+"""
+import json
+import logging
+import threading
+
+from flask import current_app
+from sqlalchemy import select, text
+
+from webapp import db
+from webapp.models import LexiconEntry, Word, WordType, category_bit
+from webapp.signals import lexicon_changed
+from webapp.word_files_handler import handler_methods
+from webapp.parser.matchers import normalize_key
+
+LOGGER = logging.getLogger(__name__)
+
+# name of lexicon lookup statement prepared on each PostgreSQL connection
+POSTGRESQL_LOOKUP_STATEMENT = "lexicon_lookup"
+
+
+class DatabaseLexicon:
+    """
+    Lexicon stored in database, words are looked up in LexiconEntry table
+    """
+
+    def __init__(self):
+        self._category_bits = None
+        lexicon_changed.connect(self._on_lexicon_changed)
+
+    def _on_lexicon_changed(self, sender, **kwargs):
+        self._category_bits = None
+
+    def category_bits(self):
+        """
+        :return: list of (bit, category name) tuples, read once per lexicon change
+        """
+        category_bits = self._category_bits
+        if category_bits is None:
+            category_bits = [(category_bit(category_id), type_name)
+                             for category_id, type_name in db.session.query(WordType.id, WordType.type_name)]
+            self._category_bits = category_bits
+        return category_bits
+
+    def lookup(self, keys):
+        """
+        :param keys: normalized words
+        :return: list of (key, category name) tuples of keys found
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+        category_bits = self.category_bits()
+        dialect = db.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            rows = self._postgresql_entries(keys)
+        elif dialect == "sqlite":
+            rows = self._sqlite_entries(keys)
+        else:
+            rows = self._entries(keys)
+        return [(key, type_name) for key, categories in rows for bit, type_name in category_bits if categories & bit]
+
+    def _entries(self, keys):
+        chunk_size = current_app.config.get("LEXICON_LOOKUP_CHUNK_SIZE", 500)
+        rows = []
+        # long questions are looked up in several queries, each with a bounded IN clause
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            rows += db.session.execute(select(LexiconEntry.key, LexiconEntry.categories)
+                                       .where(LexiconEntry.key.in_(chunk))).all()
+        return rows
+
+    def _sqlite_entries(self, keys):
+        """
+        keys are bound as one json array parameter, a question is looked up in one statement whatever its length
+        """
+        statement = text("SELECT key, categories FROM %s WHERE key IN (SELECT value FROM json_each(:keys))"
+                         % LexiconEntry.__tablename__)
+        return db.session.execute(statement, {"keys": json.dumps(keys)}).all()
+
+    def _postgresql_entries(self, keys):
+        """
+        keys are bound as one array parameter of a statement prepared once per connection, so that
+        PostgreSQL plans it once whatever the number of keys
+        """
+        connection = db.session.connection()
+        connection_info = connection.connection.info
+        if not connection_info.get(POSTGRESQL_LOOKUP_STATEMENT):
+            connection.exec_driver_sql("PREPARE %s (text[]) AS SELECT key, categories FROM %s WHERE key = ANY($1)"
+                                       % (POSTGRESQL_LOOKUP_STATEMENT, LexiconEntry.__tablename__))
+            connection_info[POSTGRESQL_LOOKUP_STATEMENT] = True
+        return connection.exec_driver_sql("EXECUTE %s (%%(keys)s)" % POSTGRESQL_LOOKUP_STATEMENT,
+                                          {"keys": keys}).all()
+
+    def words(self, categories):
+        """
+        :param categories: category names
+        :return: list of words of these categories
+        """
+        query = db.session.query(Word.word).join(WordType, Word.category == WordType.id) \
+            .filter(WordType.type_name.in_(categories))
+        return [row[0] for row in query]
+
+
+class MemoryLexicon:
+    """
+    Lexicon held in memory: normalized words are mapped to their categories
+    """
+
+    def __init__(self):
+        self.categories = dict()
+        self.surfaces = dict()
+
+    def __len__(self):
+        return len(self.categories)
+
+    def add(self, word, category):
+        key = normalize_key(word)
+        self.categories.setdefault(key, set()).add(category)
+        self.surfaces.setdefault((key, category), word)
+
+    @classmethod
+    def from_data_files(cls, data_load_config):
+        """
+        build lexicon with handler methods of each category of DATA_LOAD_CONFIG
+        """
+        lexicon = cls()
+        for category, category_config in data_load_config.items():
+            for word in getattr(handler_methods, category_config["handler"])():
+                if word:
+                    lexicon.add(word, category)
+        return lexicon
+
+    def lookup(self, keys):
+        results = []
+        for key in keys:
+            for category in self.categories.get(key, ()):
+                results.append((key, category))
+        return results
+
+    def words(self, categories):
+        return [word for (key, category), word in self.surfaces.items() if category in categories]
+
+
+class LexiconHolder:
+    """
+    Give the lexicon selected by LEXICON_BACKEND config. Memory lexicon is built on first use
+    and dropped each time the lexicon changes, or swapped with a lexicon built by a reload.
+    """
+
+    def __init__(self):
+        self.database = DatabaseLexicon()
+        # id of data loaded, set by reloads (see webapp.reload)
+        self.generation = 0
+        # prebuilt artifact the memory lexicon comes from, with "artifact" backend
+        self.artifact = None
+        self._memory = None
+        self._lock = threading.Lock()
+        lexicon_changed.connect(self._on_lexicon_changed)
+
+    def _on_lexicon_changed(self, sender, generation=None, **kwargs):
+        if generation is None:
+            self._memory = None
+            self.artifact = None
+
+    @staticmethod
+    def load(config):
+        """
+        build memory lexicon of LEXICON_BACKEND, from DATA_LOAD_CONFIG files or from LEXICON_ARTIFACT.
+        An artifact which is invalid or was built by another python version is replaced by data files.
+        :param config: app config
+        :return: tuple (MemoryLexicon, LexiconArtifact or None)
+        """
+        if config.get("LEXICON_BACKEND") == "artifact":
+            from webapp.parser.artifact import ArtifactError, LexiconArtifact
+            try:
+                artifact = LexiconArtifact.load(config["LEXICON_ARTIFACT"])
+            except ArtifactError as error:
+                LOGGER.warning(" Lexicon artifact %s rejected (%s), lexicon is built from data files",
+                               config["LEXICON_ARTIFACT"], error)
+            else:
+                return artifact.lexicon, artifact
+        return MemoryLexicon.from_data_files(config["DATA_LOAD_CONFIG"]), None
+
+    def install(self, memory, generation, artifact=None):
+        """
+        swap lexicon used by new requests, requests in progress keep the previous one
+        :param memory: a MemoryLexicon or None to build it on first use
+        :param generation: id of new data
+        :param artifact: artifact memory lexicon comes from
+        """
+        with self._lock:
+            self._memory = memory
+            self.artifact = artifact
+            self.generation = generation
+
+    def memory(self):
+        lexicon = self._memory
+        if lexicon is None:
+            with self._lock:
+                if self._memory is None:
+                    self._memory, self.artifact = self.load(current_app.config)
+                    LOGGER.info(" Memory lexicon built with %s words", len(self._memory))
+                lexicon = self._memory
+        return lexicon
+
+    def spelling_index(self, categories, max_distance):
+        """
+        :return: spelling index prebuilt in lexicon artifact, or None if there is none
+        """
+        if current_app.config.get("LEXICON_BACKEND", "database") != "artifact":
+            return None
+        self.memory()
+        artifact = self.artifact
+        return artifact.spelling_index_for(categories, max_distance) if artifact is not None else None
+
+    def get(self):
+        """
+        :return: lexicon used by requests
+        """
+        if current_app.config.get("LEXICON_BACKEND", "database") in ("memory", "artifact"):
+            return self.memory()
+        return self.database
+
+
+LEXICONS = LexiconHolder()
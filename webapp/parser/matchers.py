@@ -0,0 +1,256 @@
+"""
+Compiled matchers used by parsers to find known expressions in a question
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+PUNCTUATION = "?!.,;:\"«»()"
+ELISION = re.compile(r"^\w{1,2}['’]")
+# words of a place name, hyphens and apostrophes separate words: "Saint-Étienne" is ("Saint", "Étienne")
+NAME_WORD = re.compile(r"[^\s'’?!.,;:_\-\"«»()]+")
+
+
+def normalize_key(word):
+    """
+    lookup key of a word: casefolded and without accents, "Pàris" and "PARIS" both give "paris"
+    """
+    decomposed = unicodedata.normalize("NFKD", word.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def phrase_candidates(in_string, max_tokens):
+    """
+    list every sequence of 1 to max_tokens consecutive words of a string, sequences of
+    several words are joined with spaces and with hyphens so that both "Aix en Provence"
+    and "Aix-en-Provence" can be found in lexicon
+    :param in_string: string to split
+    :param max_tokens: maximum number of words of a sequence
+    :return: a set of strings
+    """
+    words = NAME_WORD.findall(in_string)
+    candidates = set(words)
+    for length in range(2, max_tokens + 1):
+        for start in range(len(words) - length + 1):
+            sequence = words[start:start + length]
+            candidates.add(" ".join(sequence))
+            candidates.add("-".join(sequence))
+    return candidates
+
+
+class TokenTrie:
+    """
+    Trie of token sequences. Finding the longest known sequence at a position costs at most
+    max_length steps, so a full scan of a question stays linear in its number of tokens.
+    """
+
+    def __init__(self):
+        self.root = dict()
+        self.max_length = 0
+
+    def add(self, tokens, value=True):
+        """
+        store a token sequence
+        :param tokens: sequence of tokens
+        :param value: value returned when this sequence is matched
+        """
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, dict())
+        node[None] = value
+        self.max_length = max(self.max_length, len(tokens))
+
+    def longest_match(self, tokens, start):
+        """
+        :param tokens: list of tokens
+        :param start: index of first token to match
+        :return: a tuple (end index, value) of the longest stored sequence or None
+        """
+        node = self.root
+        match = None
+        for index in range(start, len(tokens)):
+            node = node.get(tokens[index])
+            if node is None:
+                break
+            if None in node:
+                match = (index + 1, node[None])
+        return match
+
+
+class PhraseMatcher:
+    """
+    Find names made of one or several words ("Budapest", "Le Mans", "Royaume-Uni") in a string.
+    The longest name is kept at each position.
+    """
+
+    def __init__(self, names):
+        self.trie = TokenTrie()
+        for name in names:
+            tokens = NAME_WORD.findall(name)
+            if tokens:
+                self.trie.add(tokens)
+
+    def find_all(self, in_string):
+        """
+        :param in_string: string to search
+        :return: list of names found, as written in in_string
+        """
+        spans = list(NAME_WORD.finditer(in_string))
+        tokens = [span.group() for span in spans]
+        results = []
+        index = 0
+        while index < len(tokens):
+            match = self.trie.longest_match(tokens, index)
+            if match is None:
+                index += 1
+                continue
+            end = match[0]
+            results.append(in_string[spans[index].start():spans[end - 1].end()])
+            index = end
+        return results
+
+
+class LandmarkMatcher:
+    """
+    Find landmark expressions ("rue de la République", "tour Eiffel"...) in one pass.
+    Expressions ending with "..." are followed by a name, optionally introduced by a connector.
+    """
+    connectors = ("du", "de", "la", "des")
+
+    def __init__(self, expressions):
+        self.trie = TokenTrie()
+        for expression in expressions:
+            tokens = expression.casefold().split()
+            needs_name = bool(tokens) and tokens[-1] == "..."
+            if needs_name:
+                tokens = tokens[:-1]
+            if tokens:
+                self.trie.add(tokens, needs_name)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        build matcher from a vocabulary file containing one expression per line,
+        empty lines and lines starting with # are ignored
+        """
+        with open(path, "r") as vocabulary_file:
+            lines = [line.strip() for line in vocabulary_file]
+        return cls([line for line in lines if line and not line.startswith("#")])
+
+    def _name_end(self, keys, index):
+        while index < len(keys) and keys[index] in self.connectors:
+            index += 1
+        if index < len(keys):
+            return index + 1
+        return None
+
+    def find_all(self, in_string):
+        """
+        :param in_string: string to search
+        :return: list of landmark expressions found, as written in in_string
+        """
+        words = [word.strip(PUNCTUATION) for word in in_string.split()]
+        words = [word for word in words if word]
+        keys = [ELISION.sub("", word.casefold()) for word in words]
+        results = []
+        index = 0
+        while index < len(keys):
+            match = self.trie.longest_match(keys, index)
+            if match is not None:
+                end, needs_name = match
+                if needs_name:
+                    end = self._name_end(keys, end)
+                if end is not None:
+                    results.append(" ".join([ELISION.sub("", words[index])] + words[index + 1:end]))
+                    index = end
+                    continue
+            index += 1
+        return results
+
+
+def edit_distance(first, second, max_distance):
+    """
+    optimal string alignment distance (insertions, deletions, substitutions and transpositions)
+    :return: the distance or max_distance + 1 if it is greater than max_distance
+    """
+    if abs(len(first) - len(second)) > max_distance:
+        return max_distance + 1
+    previous_row = None
+    row = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        before_previous_row, previous_row = previous_row, row
+        row = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                row[j] = min(row[j], before_previous_row[j - 2] + 1)
+        if min(row) > max_distance:
+            return max_distance + 1
+    return row[-1]
+
+
+class DeletionIndex:
+    """
+    Symmetric delete index (SymSpell) of a lexicon. Each word is stored under every string obtained by
+    deleting up to max_distance characters of its prefix, so a misspelled word is looked up through its own
+    deletions only and candidates are never searched by scanning the whole lexicon.
+    """
+
+    def __init__(self, words, max_distance=2, prefix_length=7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words = dict()
+        self.deletes = dict()
+        for word in words:
+            self.add(word)
+
+    def _deletes(self, key, max_distance):
+        results = {key}
+        edits = {key}
+        for _ in range(max_distance):
+            edits = {edit[:index] + edit[index + 1:] for edit in edits for index in range(len(edit))}
+            results |= edits
+        return results
+
+    def add(self, word):
+        """
+        add a word to lexicon
+        """
+        key = normalize_key(word)
+        if key in self.words:
+            return
+        self.words[key] = word
+        for delete in self._deletes(key[:self.prefix_length], self.max_distance):
+            self.deletes.setdefault(delete, []).append(key)
+
+    def lookup(self, word, max_distance=None):
+        """
+        :param word: a word which may be misspelled
+        :param max_distance: maximum edit distance, default is index max distance
+        :return: list of (lexicon word, distance) tuples sorted by distance
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+        key = normalize_key(word)
+        if key in self.words:
+            return [(self.words[key], 0)]
+
+        candidates = set()
+        for delete in self._deletes(key[:self.prefix_length], max_distance):
+            candidates.update(self.deletes.get(delete, ()))
+        results = []
+        for candidate in candidates:
+            distance = edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                results.append((self.words[candidate], distance))
+        return sorted(results, key=lambda result: (result[1], result[0]))
+
+
+@lru_cache(maxsize=None)
+def get_landmark_matcher(path):
+    """
+    :param path: vocabulary file path
+    :return: landmark matcher compiled once per vocabulary file
+    """
+    return LandmarkMatcher.from_file(path)
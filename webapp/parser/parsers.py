@@ -4,19 +4,31 @@ All the parsers used to parse user question.
 import logging
 import re
 
-logging.basicConfig(level=logging.DEBUG)
+from flask import current_app, has_app_context
+
+from config import Config
+from webapp.log import debug_enabled
+from webapp.parser.matchers import PhraseMatcher, get_landmark_matcher
+
 LOGGER = logging.getLogger(__name__)
 
 
 class LegacyParser:
     """A parser that take an in string and return a list of word
     after comparing this string with another list of words"""
+    # relative cost of a parsing and probability that the words found are the searched ones,
+    # ParsingController pipeline mode runs cheap and decisive parsers first
+    cost = 1
+    confidence = 0
+    # database extract is only looked up for parsers which need it
+    needs_lexicon = False
 
     def __init__(self, in_string, database_extract):
         self.in_string = in_string
         self.database_extract = database_extract
         self.out_list = self._parse_string()
-        LOGGER.debug(" %s: %s", self.__class__, self.out_list)
+        if debug_enabled(LOGGER):
+            LOGGER.debug(" %s: %s", self.__class__.__name__, self.out_list)
 
     def _parse_string(self):
         return self._apply_parsing(self._get_compare_list())
@@ -34,9 +46,11 @@ class LegacyParser:
         :param contained: define what to return.
         :return: a list of words
         """
+        # a set makes each membership test constant, parsing stays linear in question length
+        compare_set = set(compare_list)
         if contained:
-            return [word for word in self._split_string() if word in compare_list and word != str()]
-        return [word for word in self._split_string() if word not in compare_list and word != str()]
+            return [word for word in self._split_string() if word in compare_set and word != str()]
+        return [word for word in self._split_string() if word not in compare_set and word != str()]
 
     def _split_string(self):
         return self.in_string.split(" ")
@@ -56,6 +70,8 @@ class FromDatabaseCompareListMixin:
     """
     Mixin allows to get compare list from table Word of database
     """
+    needs_lexicon = True
+    cost = 10
 
     def _get_compare_list(self):
         """
@@ -71,6 +87,16 @@ class FromDatabaseCompareListMixin:
         return []
 
 
+class PhraseCompareListMixin:
+    """
+    Mixin allows to find names made of several words ("Le Mans", "Aix en Provence") of compare list
+    in initial string. The longest name is kept at each position.
+    """
+
+    def _apply_parsing(self, compare_list, contained=True):
+        return PhraseMatcher(compare_list).find_all(self.in_string)
+
+
 class NonLettersParser(LegacyParser):
     """
     Class allows cleaning string before comparison
@@ -123,7 +149,7 @@ class AfterLinkWorkParser(LegacyParser):
         link_words_indexes = [index for index, word in enumerate(tmp_out_list)
                               if word in link_words]
         tmp_out_list = [tmp_out_list[index + 1] for index in link_words_indexes
-                        if index + 1 <= len(tmp_out_list)]
+                        if index + 1 < len(tmp_out_list)]
         return tmp_out_list
 
 
@@ -131,92 +157,48 @@ class StopWordsParser(NotContainedInListParserMixin, FromDatabaseCompareListMixi
     """A parser which compare provided string with a list of stop words"""
     key = "stop_words"
 
-    def _split_string(self):
-        """
-        Transform string to list by removing useless symbols, space...
-        :return: a list of words
-        """
-        symbols = ('.', '!', '?')
-        tmp_list = self.in_string.split()
-        index_list = [0] + [index + 1 for index, value in enumerate(tmp_list) if value in symbols]
-        for i in index_list:
-            if i + 1 <= len(tmp_list):
-                tmp_list[i] = tmp_list[i].lower()
-        tmp_out_list = re.split(r" +|'+|\?+|!+|\.+|_+", " ".join(tmp_list))
-        return tmp_out_list
-
 
 class FrenchWordsParser(NotContainedInListParserMixin, FromDatabaseCompareListMixin, NonLettersParser):
     """A parser which compare provided string with a list of french words"""
     key = "french_words"
 
-    def _split_string(self):
-        """
-        Transform string to list by removing useless symbols, space...
-        :return: a list of words
-        """
-        symbols = ('.', '!', '?')
-        tmp_list = self.in_string.split()
-        index_list = [0] + [index + 1 for index, value in enumerate(tmp_list) if value in symbols]
-        for i in index_list:
-            if i + 1 <= len(tmp_list):
-                tmp_list[i] = tmp_list[i].lower()
-        tmp_out_list = re.split(r" +|'+|\?+|!+|\.+|_+", " ".join(tmp_list))
-        return tmp_out_list
-
 
-class CitiesParser(FromDatabaseCompareListMixin, NonLettersParser):
+class CitiesParser(PhraseCompareListMixin, FromDatabaseCompareListMixin, NonLettersParser):
     """A parser which compare provided string with a list of cities"""
     key = "cities"
+    cost = 12
+    confidence = 0.8
 
 
-class CountriesParser(FromDatabaseCompareListMixin, NonLettersParser):
+class CountriesParser(PhraseCompareListMixin, FromDatabaseCompareListMixin, NonLettersParser):
     """A parser which compare provided string with a list of countries"""
     key = "countries"
+    cost = 12
+    confidence = 0.8
 
 
-class ExpressionParser(LegacyParser):
-    """"""
+class PlaceNameParser(LegacyParser):
+    """
+    A parser which recognizes questions made of a city or country name only ("Paris ?", "Le Mans"):
+    the name is the searched term and pipeline mode stops without running other lexicon parsers
+    """
+    needs_lexicon = True
+    cost = 10
+    confidence = 1
+    keys = ("cities", "countries")
 
     def _parse_string(self):
-        return self._apply_parsing(self._get_compare_list())
+        name = re.sub(r"[\s?!.]+$", "", self.in_string).strip()
+        if name and any(name in self.database_extract.get(key, ()) for key in self.keys):
+            return [name]
+        return []
 
-    def _get_compare_list(self):
-        return self._split_string()
 
-    def _apply_parsing(self, compare_list, contained=True):
-        """
-        Compare provided list with comparing list of word and
-        generate a new list containing intersection of both list
-        if contained parameter is True (default usage) or
-        the opposite if contained is False
-        :param compare_list: list of words used to compare with initial string words
-        :param contained: define what to return.
-        :return: a list of words
-        """
-        if contained:
-            return [word for word in self._split_string() if word in compare_list and word != str()]
-        return [word for word in self._split_string() if word not in compare_list and word != str()]
+class ExpressionParser(LegacyParser):
+    """A parser which finds landmark expressions listed in the landmarks vocabulary file"""
+    cost = 2
+    confidence = 0.95
 
-    def _split_string(self):
-        result = list()
-        sub_list = list()
-        tmp_list = self.in_string.split(" ")
-        tmp_string = str()
-        for e, word in enumerate(tmp_list):
-            if word.lower() in ['rue', 'place', 'avenue', 'impasse', 'route', 'lotissement', 'lieu-dit', 'quartier',
-                                'tour', 'château', 'parc', 'basilique', 'église', 'abbaye', 'chemin', 'carrefour',
-                                'site', 'musée', 'chapelle', 'cimetière', 'passage', 'synagogue', 'mosquée',
-                                'théâtre', 'cathédrale', 'cour']:
-                tmp_string += word
-                sub_list = tmp_list[e + 1:]
-                break
-        for e, word in enumerate(sub_list):
-            tmp_string += " " + word
-            if word.lower() not in ["du", "de", "la", "de"]:
-                break
-        print(tmp_string)
-
-        result.append(tmp_string)
-        print(result)
-        return result
+    def _parse_string(self):
+        landmarks_file = current_app.config["LANDMARKS_FILE"] if has_app_context() else Config.LANDMARKS_FILE
+        return get_landmark_matcher(landmarks_file).find_all(self.in_string)
@@ -0,0 +1,106 @@
+"""
+Typo tolerant lookup of place names ("Marseile", "Bordaux") in cities and countries lexicon
+"""
+import logging
+import threading
+
+from webapp.parser.lexicon import LEXICONS
+from webapp.parser.matchers import DeletionIndex, normalize_key
+from webapp.signals import lexicon_changed
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PlaceNamesSpeller:
+    """
+    Correct misspelled place names with a deletion index of lexicon categories.
+    Index is built on first use and dropped each time the lexicon changes.
+    """
+
+    def __init__(self, categories=("cities", "countries"), max_distance=2):
+        self.categories = categories
+        self.max_distance = max_distance
+        self._index = None
+        self._lock = threading.Lock()
+        lexicon_changed.connect(self._on_lexicon_changed)
+
+    def _on_lexicon_changed(self, sender, generation=None, **kwargs):
+        if generation is None:
+            self._index = None
+
+    def init_app(self, app):
+        """
+        configure speller with SPELLING_CATEGORIES and SPELLING_MAX_DISTANCE app config
+        """
+        self.categories = tuple(app.config.get("SPELLING_CATEGORIES", ("cities", "countries")))
+        self.max_distance = app.config.get("SPELLING_MAX_DISTANCE", 2)
+        self._index = None
+
+    def _load_words(self):
+        return LEXICONS.get().words(self.categories)
+
+    def build_index(self, lexicon):
+        """
+        :param lexicon: lexicon giving place names
+        :return: a new deletion index, not used until it is installed
+        """
+        return DeletionIndex(lexicon.words(self.categories), max_distance=self.max_distance)
+
+    def install(self, index):
+        """
+        swap index used by new corrections
+        """
+        with self._lock:
+            self._index = index
+
+    @property
+    def index(self):
+        """
+        :return: the deletion index, built from database if needed
+        """
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = LEXICONS.spelling_index(self.categories, self.max_distance) or \
+                        DeletionIndex(self._load_words(), max_distance=self.max_distance)
+                    LOGGER.info(" Spelling index built with %s words", len(self._index.words))
+                index = self._index
+        return index
+
+    def allowed_distance(self, term):
+        """
+        short words have too many neighbours to be corrected safely
+        :return: maximum edit distance allowed to correct term
+        """
+        return min(self.max_distance, (len(term) - 1) // 3)
+
+    def known(self, term):
+        """
+        :param term: a searched term
+        :return: True if term is a word of the lexicon, in any category: it is not misspelled
+        """
+        return bool(LEXICONS.get().lookup([normalize_key(term)]))
+
+    def correct(self, term):
+        """
+        :param term: a searched term
+        :return: the closest place name or term itself if there is none, several equally close ones,
+        or if term is a word of the lexicon ("paria" is not a misspelled "Paris")
+        """
+        max_distance = self.allowed_distance(term)
+        if max_distance < 1:
+            return term
+        candidates = self.index.lookup(term, max_distance)
+        if not candidates or candidates[0][1] == 0:
+            return term
+        if len(candidates) > 1 and candidates[1][1] == candidates[0][1]:
+            return term
+        # the lexicon is only queried when a correction is found
+        if self.known(term):
+            return term
+        LOGGER.info(" Spelling: %s corrected to %s", term, candidates[0][0])
+        return candidates[0][0]
+
+
+PLACE_NAMES_SPELLER = PlaceNamesSpeller()
@@ -0,0 +1,124 @@
+"""
+Question templates matched before parsing. Most questions have a known shape ("Où se trouve X ?",
+"C'est où X ?"), their subject is extracted by a single regular expression and parsers are not launched.
+"""
+import logging
+import re
+import threading
+
+from webapp.metrics import METRICS
+from webapp.parser.matchers import NAME_WORD
+
+LOGGER = logging.getLogger(__name__)
+
+SUBJECT = "{subject}"
+# up to three words followed by punctuation: "Salut GrandPy !", "Bonjour vieille branche !", "Ola !"
+GREETING = r"(?:\w+(?:\s+\w+){0,2}\s*[!,.]+\s*)?"
+# subject starts with a capital letter or a digit and has at most 6 words
+SUBJECT_PATTERN = r"(?P<%s>[A-ZÀ-ÖØ-Þ0-9][\w'’\-]*(?:\s+\w[\w'’\-]*){0,5})"
+# lower case words allowed inside a subject: "Aix en Provence", "Boulogne sur Mer", "Le Mans"
+CONNECTORS = ("de", "du", "des", "la", "le", "les", "l", "d", "en", "sur", "sous", "lès")
+
+
+def template_pattern(template, group):
+    """
+    translate a template to a regular expression, words are case insensitive, spaces match any blank
+    and apostrophes match both ' and ’
+    :param template: template containing {subject} once
+    :param group: name of subject group
+    :return: a regular expression string
+    """
+    before, after = template.split(SUBJECT)
+
+    def literal(text):
+        text = re.escape(text.strip().rstrip("?!. ")).replace(r"\ ", r"\s+").replace("'", "['’]")
+        return "(?i:%s)" % text if text else ""
+
+    pattern = literal(before)
+    if pattern:
+        pattern += r"\s*" if before.endswith("'") else r"\s+"
+    pattern += SUBJECT_PATTERN % group
+    if literal(after):
+        pattern += r"\s+" + literal(after)
+    return pattern
+
+
+class QuestionTemplates:
+    """
+    All templates compiled in one alternation, a question is matched in one pass
+    """
+
+    def __init__(self, templates):
+        # longest templates first: "tu connais l'adresse de {subject}" is tried before "tu connais {subject}"
+        self.templates = sorted([template for template in templates if template.count(SUBJECT) == 1],
+                                key=len, reverse=True)
+        alternatives = [template_pattern(template, "t%d" % index) for index, template in enumerate(self.templates)]
+        self.regex = None
+        if alternatives:
+            self.regex = re.compile(r"\s*%s(?:%s)\s*[?!.]*\s*" % (GREETING, "|".join(alternatives)))
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        build templates from a file containing one template per line,
+        empty lines and lines starting with # are ignored
+        """
+        with open(path, "r") as templates_file:
+            lines = [line.strip() for line in templates_file]
+        return cls([line for line in lines if line and not line.startswith("#")])
+
+    def match(self, in_string):
+        """
+        :param in_string: user question
+        :return: subject of question or None if no template matches
+        """
+        if self.regex is None:
+            return None
+        match = self.regex.fullmatch(in_string)
+        if match is None:
+            return None
+        subject = match.group(match.lastgroup)
+        words = NAME_WORD.findall(subject)
+        if not all(word[0].isupper() or word[0].isdigit() or word.casefold() in CONNECTORS for word in words):
+            return None
+        return subject
+
+
+class TemplateMatcher:
+    """
+    Templates of QUESTION_TEMPLATES_FILE app config with match counters
+    """
+
+    def __init__(self):
+        self.templates = QuestionTemplates([])
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        load QUESTION_TEMPLATES_FILE app config, an empty value disables templates
+        """
+        path = app.config.get("QUESTION_TEMPLATES_FILE")
+        self.templates = QuestionTemplates.from_file(path) if path else QuestionTemplates([])
+        LOGGER.debug(" %d question templates loaded", len(self.templates.templates))
+
+    def match(self, in_string):
+        """
+        :param in_string: user question
+        :return: subject of question or None if no template matches
+        """
+        subject = self.templates.match(in_string)
+        with self._lock:
+            if subject is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return subject
+
+
+QUESTION_TEMPLATES = TemplateMatcher()
+METRICS.add_value("question_templates_hits_total", "Questions answered by a template.",
+                  lambda: QUESTION_TEMPLATES.hits, kind="counter")
+METRICS.add_value("question_templates_misses_total", "Questions sent to parsers.",
+                  lambda: QUESTION_TEMPLATES.misses, kind="counter")
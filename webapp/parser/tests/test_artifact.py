@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+from flask_testing import TestCase
+
+from webapp import app
+from webapp.parser.artifact import ArtifactError, HEADER, LexiconArtifact, build_artifact
+from webapp.parser.controller import ParsingController
+from webapp.parser.lexicon import LEXICONS, MemoryLexicon
+from webapp.parser.spelling import PLACE_NAMES_SPELLER
+from webapp.parser.tests.test_performance import load_questions
+
+
+class TestLexiconArtifact(TestCase):
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        return app
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "lexicon.bin")
+        self.memory_lexicon = MemoryLexicon.from_data_files(app.config["DATA_LOAD_CONFIG"])
+
+    def tearDown(self):
+        app.config.from_object("config.TestConfig")
+        LEXICONS.install(None, LEXICONS.generation)
+        PLACE_NAMES_SPELLER.install(None)
+        shutil.rmtree(self.folder)
+
+    def test_round_trip(self):
+        build_artifact(app.config["DATA_LOAD_CONFIG"]).save(self.path)
+        artifact = LexiconArtifact.load(self.path)
+        keys = ["paris", "budapest", "japon", "tu", "adresse", "openclassrooms"]
+        self.assertEqual(sorted(self.memory_lexicon.lookup(keys)), sorted(artifact.lexicon.lookup(keys)))
+        self.assertEqual(sorted(self.memory_lexicon.words(["cities"])), sorted(artifact.lexicon.words(["cities"])))
+        self.assertEqual([("Budapest", 1)], artifact.spelling_index.lookup("Budapets"))
+        self.assertIsNone(artifact.spelling_index_for(("cities",), 2))
+
+    def test_corrupted(self):
+        data = bytearray(build_artifact(app.config["DATA_LOAD_CONFIG"]).dumps())
+        with pytest.raises(ArtifactError, match="truncated"):
+            LexiconArtifact.loads(bytes(data[:-1]))
+        data[-1] ^= 0xFF
+        with pytest.raises(ArtifactError, match="checksum"):
+            LexiconArtifact.loads(bytes(data))
+        data[4:6] = b"\x00\x09"
+        with pytest.raises(ArtifactError, match="format 9"):
+            LexiconArtifact.loads(bytes(data[:HEADER.size]))
+
+    def test_other_python_version(self):
+        data = bytearray(build_artifact(app.config["DATA_LOAD_CONFIG"]).dumps())
+        data[9] = (data[9] + 1) % 256
+        with pytest.raises(ArtifactError, match="built by python"):
+            LexiconArtifact.loads(bytes(data))
+        data[6:8] = b"\x00\x00"
+        with pytest.raises(ArtifactError, match="marshal version 0"):
+            LexiconArtifact.loads(bytes(data))
+        with open(self.path, "wb") as artifact_file:
+            artifact_file.write(data)
+        app.config.update(LEXICON_BACKEND="artifact", LEXICON_ARTIFACT=self.path)
+        lexicon, artifact = LEXICONS.load(app.config)
+        self.assertIsNone(artifact)
+        self.assertEqual(self.memory_lexicon.categories, lexicon.categories)
+
+    def test_artifact_backend(self):
+        result = app.test_cli_runner().invoke(args=["build-lexicon", "--output", self.path])
+        self.assertEqual(0, result.exit_code, result.output)
+        app.config.update(LEXICON_BACKEND="artifact", LEXICON_ARTIFACT=self.path)
+        LEXICONS.install(None, LEXICONS.generation)
+        PLACE_NAMES_SPELLER.install(None)
+        for question in load_questions():
+            self.assertEqual(ParsingController(question, lexicon=self.memory_lexicon).out_list,
+                             ParsingController(question).out_list)
+        self.assertIs(LEXICONS.artifact.spelling_index, PLACE_NAMES_SPELLER.index)
+        self.assertEqual("Budapest", PLACE_NAMES_SPELLER.correct("Budapets"))
@@ -1,8 +1,12 @@
 from flask_testing import TestCase
+from sqlalchemy import text
 
 from webapp import app
 from webapp.models import db, WordType, Word
-from webapp import FiletoDbHandler
+from webapp import FiletoDbHandler, load_words_to_db
+from webapp.models import LexiconEntry
+from webapp.parser.lexicon import LEXICONS
+from webapp.signals import lexicon_changed
 
 
 class TestDataLoading(TestCase):
@@ -39,6 +43,56 @@ class TestDataLoading(TestCase):
         key = "cities"
         self.protocol(db, key)
 
+    def test_normalized_keys(self):
+        FiletoDbHandler(db, "cities")()
+        word = db.session.query(Word).filter(Word.word == "Saint-Etienne").first()
+        self.assertEqual(word.key, "saint-etienne")
+
     def test_load_to_db_countries(self):
         key = "countries"
         self.protocol(db, key)
+
+    def test_handler_fills_lexicon(self):
+        FiletoDbHandler(db, "cities")()
+        self.assertIn(("paris", "cities"), LEXICONS.database.lookup(["paris"]))
+
+    def test_load_words_signals_once_entries_exist(self):
+        entries = []
+
+        def on_lexicon_changed(sender, **kwargs):
+            entries.append(db.session.query(LexiconEntry).count())
+
+        lexicon_changed.connect(on_lexicon_changed)
+        try:
+            load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+        finally:
+            lexicon_changed.disconnect(on_lexicon_changed)
+        self.assertEqual(1, len(entries))
+        self.assertGreater(entries[0], 0)
+
+    def test_upgrade_schema(self):
+        db.drop_all()
+        # schema before Word.key column and LexiconEntry table
+        with db.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE word_type (id INTEGER PRIMARY KEY, type_name VARCHAR(200) NOT NULL)"))
+            connection.execute(text("CREATE TABLE word (id INTEGER PRIMARY KEY, word VARCHAR(200) NOT NULL, "
+                                    "category INTEGER NOT NULL REFERENCES word_type (id))"))
+            connection.execute(text("INSERT INTO word_type (id, type_name) VALUES (1, 'cities')"))
+            connection.execute(text("INSERT INTO word (word, category) VALUES ('Saint-Étienne', 1), ('Pàris', 1)"))
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["upgrade-db"])
+        self.assertEqual(0, result.exit_code, result.output)
+        self.assertIn("2 word keys filled", result.output)
+        self.assertEqual({"saint-etienne", "paris"}, {word.key for word in db.session.query(Word)})
+        self.assertIn(("paris", "cities"), LEXICONS.database.lookup(["paris"]))
+        result = runner.invoke(args=["upgrade-db"])
+        self.assertIn("0 word keys filled", result.output)
+
+    def test_init_db_twice(self):
+        runner = app.test_cli_runner()
+        self.assertEqual(0, runner.invoke(args=["init-db"]).exit_code)
+        count = db.session.query(Word).count()
+        result = runner.invoke(args=["init-db"])
+        self.assertNotEqual(0, result.exit_code)
+        self.assertIn("flask upgrade-db", result.output)
+        self.assertEqual(count, db.session.query(Word).count())
@@ -0,0 +1,88 @@
+import os
+import unittest
+
+from flask_testing import TestCase
+
+from config import TestConfig
+from webapp import load_words_to_db
+from webapp import app, create_app
+from webapp import db
+from webapp.models import LexiconEntry, Word, WordType, category_bit
+from webapp.parser.controller import ParsingController
+from webapp.parser.lexicon import LEXICONS, MemoryLexicon
+from webapp.parser.tests.test_performance import load_questions
+from webapp.query_counter import QUERY_COUNTER
+
+
+class TestLexicons(TestCase):
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        return app
+
+    def setUp(self):
+        db.create_all()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+        self.memory_lexicon = MemoryLexicon.from_data_files(app.config["DATA_LOAD_CONFIG"])
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def test_lookup(self):
+        keys = ["paris", "budapest", "japon", "tu", "adresse", "openclassrooms"]
+        self.assertEqual(sorted(self.memory_lexicon.lookup(keys)), sorted(LEXICONS.database.lookup(keys)))
+
+    def test_chunked_lookup(self):
+        keys = ["paris", "budapest", "japon", "tu", "adresse", "openclassrooms"]
+        expected = sorted(LEXICONS.database._entries(keys))
+        app.config["LEXICON_LOOKUP_CHUNK_SIZE"] = 2
+        try:
+            self.assertEqual(sorted(LEXICONS.database._entries(keys)), expected)
+        finally:
+            app.config["LEXICON_LOOKUP_CHUNK_SIZE"] = 500
+        self.assertEqual(sorted(LEXICONS.database._sqlite_entries(keys)), expected)
+
+    def test_lookup_is_one_statement(self):
+        keys = ["paris", "tu"] + ["mot%d" % index for index in range(3000)]
+        # categories are read once per lexicon change
+        LEXICONS.database.category_bits()
+        with QUERY_COUNTER.recording() as statements:
+            self.assertEqual(sorted(self.memory_lexicon.lookup(keys)), sorted(LEXICONS.database.lookup(keys)))
+        self.assertEqual(1, len(statements))
+
+    def test_lexicon_entries(self):
+        expected = dict()
+        for key, category_id in db.session.query(Word.key, WordType.id).join(WordType, Word.category == WordType.id):
+            expected[key] = expected.get(key, 0) | category_bit(category_id)
+        self.assertGreater(len([bits for bits in expected.values() if bits & (bits - 1)]), 0)
+        self.assertEqual(dict(db.session.query(LexiconEntry.key, LexiconEntry.categories)), expected)
+
+    def test_words(self):
+        self.assertEqual(sorted(self.memory_lexicon.words(["cities"])), sorted(LEXICONS.database.words(["cities"])))
+
+    def test_same_parsing_results(self):
+        for question in load_questions():
+            self.assertEqual(ParsingController(question, lexicon=self.memory_lexicon).out_list,
+                             ParsingController(question, lexicon=LEXICONS.database).out_list)
+
+
+@unittest.skipUnless(os.environ.get("POSTGRESQL_TEST_URL"), "POSTGRESQL_TEST_URL is not set")
+class TestPostgresqlLexicon(TestCase):
+    def create_app(self):
+        return create_app(type("PostgresqlTestConfig", (TestConfig,), {
+            "SQLALCHEMY_DATABASE_URI": os.environ.get("POSTGRESQL_TEST_URL")}))
+
+    def setUp(self):
+        db.create_all()
+        load_words_to_db(db, self.app.config["DATA_LOAD_CONFIG"])
+        self.memory_lexicon = MemoryLexicon.from_data_files(self.app.config["DATA_LOAD_CONFIG"])
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def test_prepared_lookup(self):
+        keys = ["paris", "budapest", "japon", "tu", "adresse", "openclassrooms"]
+        self.assertEqual(sorted(LEXICONS.database.lookup(keys)), sorted(self.memory_lexicon.lookup(keys)))
+        self.assertEqual(sorted(LEXICONS.database.lookup(keys[:2])), sorted(self.memory_lexicon.lookup(keys[:2])))
+        self.assertEqual(LEXICONS.database.lookup([]), [])
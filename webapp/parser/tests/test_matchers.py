@@ -0,0 +1,81 @@
+from webapp.parser.matchers import TokenTrie, LandmarkMatcher, PhraseMatcher, DeletionIndex, phrase_candidates, \
+    edit_distance, normalize_key
+
+
+class TestTokenTrie:
+    def setup_method(self):
+        self.trie = TokenTrie()
+        self.trie.add(["place"], "short")
+        self.trie.add(["place", "de", "la", "concorde"], "long")
+
+    def test_longest_match(self):
+        tokens = ["la", "place", "de", "la", "concorde"]
+        assert self.trie.longest_match(tokens, 1) == (5, "long")
+        assert self.trie.longest_match(["place", "de", "la", "bastille"], 0) == (1, "short")
+        assert self.trie.longest_match(tokens, 0) is None
+        assert self.trie.max_length == 4
+
+
+class TestLandmarkMatcher:
+    def setup_method(self):
+        self.matcher = LandmarkMatcher(["rue ...", "tour ...", "tour eiffel", "arc de triomphe"])
+
+    def test_find_all(self):
+        in_string = "La rue du Bac, la tour Eiffel et l'Arc de Triomphe ?"
+        assert self.matcher.find_all(in_string) == ["rue du Bac", "tour Eiffel", "Arc de Triomphe"]
+
+    def test_name_required(self):
+        assert self.matcher.find_all("Quelle est cette rue de la") == []
+
+    def test_punctuation(self):
+        assert self.matcher.find_all("Où est la rue Carnot?") == ["rue Carnot"]
+
+
+class TestPhraseMatcher:
+    def setup_method(self):
+        self.matcher = PhraseMatcher(["Le Mans", "Mans", "Saint-Étienne", "Royaume-Uni", "Aix-en-Provence"])
+
+    def test_find_all(self):
+        in_string = "De Saint-Étienne au Mans, puis Aix en Provence et le Royaume-Uni"
+        assert self.matcher.find_all(in_string) == ["Saint-Étienne", "Mans", "Aix en Provence", "Royaume-Uni"]
+
+    def test_longest_name(self):
+        assert self.matcher.find_all("Où est Le Mans ?") == ["Le Mans"]
+
+
+def test_phrase_candidates():
+    candidates = phrase_candidates("Aix en Provence ?", 3)
+    assert {"Aix", "en", "Provence", "Aix en", "Aix-en-Provence", "Aix en Provence"} <= candidates
+    assert len(phrase_candidates("un deux trois quatre", 2)) == 4 + 3 * 2
+
+
+def test_edit_distance():
+    assert edit_distance("Marseille", "Marseille", 2) == 0
+    assert edit_distance("Marseile", "Marseille", 2) == 1
+    assert edit_distance("Bordaux", "Bordeaux", 2) == 1
+    assert edit_distance("Budapets", "Budapest", 2) == 1
+    assert edit_distance("Lyon", "Marseille", 2) == 3
+
+
+class TestDeletionIndex:
+    def setup_method(self):
+        self.index = DeletionIndex(["Marseille", "Bordeaux", "Paris", "Pau", "Saint-Étienne-du-Rouvray"])
+
+    def test_exact(self):
+        assert self.index.lookup("paris") == [("Paris", 0)]
+
+    def test_misspelled(self):
+        assert self.index.lookup("Marseile") == [("Marseille", 1)]
+        assert self.index.lookup("Bordaux") == [("Bordeaux", 1)]
+        assert self.index.lookup("Saint-Étienne-du-Rouvrai") == [("Saint-Étienne-du-Rouvray", 1)]
+
+    def test_max_distance(self):
+        assert self.index.lookup("Parsi", 1) == [("Paris", 1)]
+        assert self.index.lookup("Prais", 0) == []
+        assert self.index.lookup("Openclassrooms") == []
+
+
+def test_normalize_key():
+    assert normalize_key("Pàris") == "paris"
+    assert normalize_key("PARIS") == "paris"
+    assert normalize_key("Saint-Étienne") == "saint-etienne"
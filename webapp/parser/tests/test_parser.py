@@ -91,6 +91,10 @@ class TestAfterLinkWorkParser:
         assert "Paris" in parser.out_list
         assert "à" not in parser.out_list
 
+    def test_link_word_at_end(self):
+        parser = AfterLinkWorkParser("Je vais chez", self.database_extract)
+        assert parser.out_list == []
+
 
 class TestStopWordsParser(TestCase):
     def create_app(self):
@@ -211,3 +215,21 @@ class TestKeyWordParser:
         assert "rue de la République" in parser.out_list
         assert "République" not in parser.out_list
 
+    def test_multiple_expressions(self):
+        in_string = "Vaut-il mieux visiter la Tour Eiffel ou la place de la Concorde ?"
+        parser = ExpressionParser(in_string, self.database_extract)
+        assert parser.out_list == ["Tour Eiffel", "place de la Concorde"]
+
+    def test_no_expression(self):
+        parser = ExpressionParser("Où se trouve Budapest ?", self.database_extract)
+        assert parser.out_list == []
+
+
+class TestPhraseCitiesParser:
+    def setup_method(self):
+        self.in_string = "Tu préfères Le Mans ou Aix en Provence ?"
+        self.database_extract = {'cities': ['Mans', 'Le Mans', 'Aix', 'Aix-en-Provence']}
+
+    def test_parse_string(self):
+        parser = CitiesParser(self.in_string, self.database_extract)
+        assert parser.out_list == ["Le Mans", "Aix en Provence"]
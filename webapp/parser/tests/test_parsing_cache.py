@@ -0,0 +1,112 @@
+from flask_testing import TestCase
+
+from webapp import app, db, load_words_to_db
+from webapp.parser.cache import ParsingCache, normalize_question
+from webapp.parser.controller import ParsingController
+from webapp.parser.tests.test_performance import load_questions
+from webapp.signals import lexicon_changed
+
+
+class FakeParse:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, in_string):
+        self.calls += 1
+        return in_string.split()
+
+
+def test_normalize_question():
+    first = normalize_question("Salut GrandPy ! Est-ce que tu connais l'adresse d'Openclassrooms ?")
+    second = normalize_question(" Salut GrandPy ! Est-ce que tu connais l'adresse d'Openclassrooms?! ")
+    assert first == second
+    assert first == "Salut GrandPy ! Est-ce que tu connais l'adresse d'Openclassrooms"
+    assert normalize_question("Tu connais le musée d'Orsay ?") != normalize_question("Tu connais le musée d Orsay ?")
+
+
+class TestSharedKeys(TestCase):
+    """
+    questions sharing a cache key must have the same parsing results
+    """
+
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        return app
+
+    def setUp(self):
+        db.create_all()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def test_same_parsing(self):
+        questions = load_questions() + ["Tu connais le musée d'Orsay ?", "Où est Paris", "C'est où Lyon ?!"]
+        variants = [
+            lambda question: question + " ?",
+            lambda question: question + "?!.",
+            lambda question: "  %s  " % question,
+            lambda question: question.rstrip("?!. "),
+            lambda question: question.replace("'", " "),
+            lambda question: question.replace(" ", "  "),
+            lambda question: question.replace(",", ""),
+            lambda question: question.lower(),
+        ]
+        results = dict()
+        for question in questions:
+            for variant in [question] + [variant(question) for variant in variants]:
+                out_list = ParsingController(variant).out_list
+                key = normalize_question(variant)
+                self.assertEqual(results.setdefault(key, (variant, out_list))[1], out_list,
+                                 "%r and %r share a key" % (results[key][0], variant))
+
+
+class TestParsingCache:
+    def setup_method(self):
+        self.cache = ParsingCache(maxsize=2)
+        self.parse = FakeParse()
+
+    def test_hit(self):
+        first = self.cache.get("Où est Paris ?", self.parse)
+        second = self.cache.get("Où est Paris?", self.parse)
+        assert first == second
+        assert self.parse.calls == 1
+        stats = self.cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_case_kept(self):
+        assert self.cache.get("Où est PARIS ?", self.parse) == ["Où", "est", "PARIS", "?"]
+        assert self.cache.get("où est Paris ?", self.parse) == ["où", "est", "Paris", "?"]
+        assert self.parse.calls == 2
+
+    def test_result_is_a_copy(self):
+        self.cache.get("Paris", self.parse).append("Lyon")
+        assert self.cache.get("Paris", self.parse) == ["Paris"]
+
+    def test_bounded(self):
+        for question in ("Paris", "Lyon", "Budapest"):
+            self.cache.get(question, self.parse)
+        assert len(self.cache) == 2
+        self.cache.get("Paris", self.parse)
+        assert self.parse.calls == 4
+
+    def test_namespace(self):
+        self.cache.get("Paris", self.parse, namespace="first")
+        self.cache.get("Paris", self.parse, namespace="second")
+        assert self.parse.calls == 2
+
+    def test_invalidated_on_lexicon_change(self):
+        self.cache.get("Paris", self.parse)
+        lexicon_changed.send(self)
+        assert len(self.cache) == 0
+        self.cache.get("Paris", self.parse)
+        assert self.parse.calls == 2
+
+    def test_disabled(self):
+        cache = ParsingCache(maxsize=0)
+        cache.get("Paris", self.parse)
+        cache.get("Paris", self.parse)
+        assert self.parse.calls == 2
@@ -1,9 +1,13 @@
+import os
+from unittest import mock
+
 from flask_testing import TestCase
 
 from webapp import app
 from webapp.parser.controller import ParsingController
+from webapp.parser.parsers import CitiesParser, PlaceNameParser
 from webapp import db
-from webapp import FiletoDbHandler
+from webapp import load_words_to_db
 
 
 class TestParsingControler(TestCase):
@@ -14,8 +18,7 @@ class TestParsingControler(TestCase):
     def setUp(self):
         self.in_string = "Salut GrandPy ! Est-ce que tu connais l'adresse d'Openclassrooms à Paris ?"
         db.create_all()
-        for key in app.config["DATA_LOAD_CONFIG"].keys():
-            FiletoDbHandler(db, key)()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
 
     def tearDown(self):
         db.session.remove()
@@ -73,3 +76,49 @@ class TestParsingControler(TestCase):
         self.assertGreater(len(result), 0)
         self.assertIn("rue de la République", result)
         self.assertEqual(result[0], "rue de la République")
+
+    def test_ask_database_multi_words_names(self):
+        controler = ParsingController("Tu préfères Le Mans ou Aix en Provence ?")
+        self.assertIn("Le Mans", controler.database_extract["cities"])
+        self.assertIn("Aix-en-Provence", controler.database_extract["cities"])
+
+    def test_ask_database_ignores_case_and_accents(self):
+        controler = ParsingController("Tu connais PARIS, pàris ou saint-etienne ?")
+        self.assertIn("PARIS", controler.database_extract["cities"])
+        self.assertIn("pàris", controler.database_extract["cities"])
+        self.assertIn("saint-etienne", controler.database_extract["cities"])
+
+    def test_pipeline_finds_same_first_word(self):
+        with open(os.path.join(app.config["DATA_PATH"], "questions/questions_sample.txt"), "r") as questions_file:
+            questions = [line.strip() for line in questions_file if line.strip()]
+        questions += [self.in_string, "Je paris que tu ne sais pas où se trouve Saint-Étienne",
+                      "Que peux-tu me dire sur les Champs-Élysées?", "Je cherche la place Carnot",
+                      "Je paris que tu sais pas où se trouve strasbourg!",
+                      "Salut GrandPy ! Est-ce que tu connais la rue de la République à Lyon ?"]
+        for question in questions:
+            full = ParsingController(question, mode="full").out_list
+            pipeline = ParsingController(question, mode="pipeline").out_list
+            # the first term is the only one sent to apis, following terms are not guaranteed
+            self.assertEqual(full[:1], pipeline[:1], question)
+
+    def test_pipeline_stops_on_place_name(self):
+        launched = []
+        launch = ParsingController._parser_launcher
+
+        def record(controller, parser):
+            launched.append(parser)
+            return launch(controller, parser)
+
+        with mock.patch.object(ParsingController, "_parser_launcher", record):
+            for question in ("Saint-Étienne ?", "Le Mans", "Paris !"):
+                del launched[:]
+                controler = ParsingController(question, mode="pipeline")
+                self.assertEqual(controler.out_list[0], question.rstrip(" ?!"))
+                self.assertEqual(launched[-1], PlaceNameParser, question)
+                self.assertNotIn(CitiesParser, launched)
+        self.assertEqual(["Paris"], ParsingController("Paris !", mode="full").out_list[:1])
+
+    def test_pipeline_skips_lexicon_for_landmarks(self):
+        controler = ParsingController("Où se trouve la tour Eiffel ?", mode="pipeline")
+        self.assertEqual(controler.out_list[0], "tour Eiffel")
+        self.assertIsNone(controler._database_extract)
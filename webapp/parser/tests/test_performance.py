@@ -0,0 +1,129 @@
+"""
+Parsing micro-benchmarks compared to a recorded baseline.
+Durations are divided by the duration of a calibration loop so that the baseline can be
+compared between machines. Run with PERF_UPDATE_BASELINE=1 to record a new baseline.
+Latency regressions fail the suite by default. Durations still depend on machine load: on a shared or
+throttled machine, PERF_TIMING=0 only checks allocations, which are deterministic.
+"""
+import json
+import os
+import time
+import tracemalloc
+
+from flask_testing import TestCase
+
+from webapp import load_words_to_db
+from webapp import app
+from webapp import db
+from webapp.parser.controller import ParsingController
+from webapp.parser.lexicon import LEXICONS, MemoryLexicon
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "performance_baseline.json")
+TIME_TOLERANCE = float(os.environ.get("PERF_TIME_TOLERANCE", 2.0))
+ALLOCATION_TOLERANCE = float(os.environ.get("PERF_ALLOCATION_TOLERANCE", 1.5))
+# allocations differences below this size are noise
+ALLOCATION_SLACK = 4096
+UPDATE_BASELINE = os.environ.get("PERF_UPDATE_BASELINE") == "1"
+CHECK_TIMING = os.environ.get("PERF_TIMING", "1") != "0" or UPDATE_BASELINE
+
+
+def calibration_loop():
+    values = dict()
+    for index in range(20000):
+        values[str(index % 500)] = values.get(str(index % 500), 0) + index
+    return values
+
+
+def best_duration(func, repeat=7, number=10):
+    """
+    :return: best duration of number consecutive calls of func
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def peak_allocation(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def load_questions():
+    with open(os.path.join(app.config["DATA_PATH"], "questions/questions_sample.txt"), "r") as questions_file:
+        return [line.strip() for line in questions_file if line.strip()]
+
+
+class TestParsingPerformance(TestCase):
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        return app
+
+    def setUp(self):
+        db.create_all()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+        self.questions = load_questions()
+        self.memory_lexicon = MemoryLexicon.from_data_files(app.config["DATA_LOAD_CONFIG"])
+        self.calibration = best_duration(calibration_loop) if CHECK_TIMING else None
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def check(self, benchmarks):
+        """
+        measure benchmarks and compare them to baseline, or record them in baseline
+        :param benchmarks: dict of benchmark names and functions running the whole corpus
+        """
+        results = dict()
+        for name, func in benchmarks.items():
+            func()
+            results[name] = {"peak_bytes": peak_allocation(func)}
+            if CHECK_TIMING:
+                results[name]["relative_time"] = round(best_duration(func) / self.calibration, 4)
+
+        baseline = dict()
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, "r") as baseline_file:
+                baseline = json.load(baseline_file)
+        if UPDATE_BASELINE:
+            baseline.update(results)
+            with open(BASELINE_PATH, "w") as baseline_file:
+                json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+            return
+
+        regressions = []
+        for name, result in results.items():
+            self.assertIn(name, baseline, "no baseline for %s, run with PERF_UPDATE_BASELINE=1" % name)
+            expected = baseline[name]
+            if CHECK_TIMING and result["relative_time"] > expected["relative_time"] * TIME_TOLERANCE:
+                regressions.append("%s time: %s > %s" % (name, result["relative_time"], expected["relative_time"]))
+            if result["peak_bytes"] > expected["peak_bytes"] * ALLOCATION_TOLERANCE + ALLOCATION_SLACK:
+                regressions.append("%s allocations: %s > %s" % (name, result["peak_bytes"], expected["peak_bytes"]))
+        self.assertEqual(regressions, [])
+
+    def test_controllers(self):
+        self.check({
+            "controller_database": lambda: [ParsingController(question, lexicon=LEXICONS.database)
+                                            for question in self.questions],
+            "controller_memory": lambda: [ParsingController(question, lexicon=self.memory_lexicon)
+                                          for question in self.questions],
+            "controller_pipeline": lambda: [ParsingController(question, lexicon=self.memory_lexicon, mode="pipeline")
+                                            for question in self.questions],
+        })
+
+    def test_parsers(self):
+        extracts = [(question, ParsingController(question, lexicon=LEXICONS.database).database_extract)
+                    for question in self.questions]
+        benchmarks = dict()
+        for parser, _ in ParsingController.parsers:
+            benchmarks["parser_" + parser.__name__] = \
+                lambda parser=parser: [parser(question, extract) for question, extract in extracts]
+        self.check(benchmarks)
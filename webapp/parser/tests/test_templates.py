@@ -0,0 +1,68 @@
+import os
+
+from flask_testing import TestCase
+
+from webapp import app, db, load_words_to_db
+from webapp.parser.controller import ParsingController
+from webapp.parser.templates import QuestionTemplates, TemplateMatcher
+from webapp.search_manager import SearchConductor
+
+
+class TestQuestionTemplates:
+    def setup_method(self):
+        self.templates = QuestionTemplates(["où se trouve {subject} ?", "tu connais {subject}",
+                                            "tu connais l'adresse d'{subject}", "c'est où {subject}"])
+
+    def test_match(self):
+        assert self.templates.match("Où se trouve Budapest ?") == "Budapest"
+        assert self.templates.match("C'est où Saint-Étienne?") == "Saint-Étienne"
+        assert self.templates.match("OÙ SE TROUVE Aix en Provence") == "Aix en Provence"
+
+    def test_longest_template_first(self):
+        assert self.templates.match("Tu connais l’adresse d’OpenClassrooms ?") == "OpenClassrooms"
+
+    def test_greeting(self):
+        assert self.templates.match("Salut GrandPy ! Tu connais Le Mans ?") == "Le Mans"
+
+    def test_no_match(self):
+        assert self.templates.match("Où se trouve la tour Eiffel ?") is None
+        assert self.templates.match("Où se trouve Budapest et Paris ?") is None
+        assert self.templates.match("Je paris que tu ne sais pas où se trouve Saint-Étienne") is None
+        assert QuestionTemplates([]).match("Où se trouve Budapest ?") is None
+
+    def test_counters(self):
+        matcher = TemplateMatcher()
+        matcher.templates = self.templates
+        matcher.match("Où se trouve Budapest ?")
+        matcher.match("Où se trouve la tour Eiffel ?")
+        assert (matcher.hits, matcher.misses) == (1, 1)
+
+
+class TestTemplatesAgainstParsers(TestCase):
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        return app
+
+    def setUp(self):
+        db.create_all()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+        self.templates = QuestionTemplates.from_file(app.config["QUESTION_TEMPLATES_FILE"])
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def test_same_subject_as_parsers(self):
+        with open(os.path.join(app.config["DATA_PATH"], "questions/questions_sample.txt"), "r") as questions_file:
+            questions = [line.strip() for line in questions_file if line.strip()]
+        matched = [question for question in questions if self.templates.match(question) is not None]
+        self.assertGreater(len(matched), 0)
+        for question in matched:
+            self.assertEqual(self.templates.match(question), ParsingController(question).out_list[0], question)
+
+    def test_search_conductor_skips_parsers(self):
+        def parsing_controller(in_string):
+            raise AssertionError("parsers should not be launched")
+
+        search_conductor = SearchConductor("Où se trouve Budapest ?", parsing_controller=parsing_controller)
+        self.assertEqual(search_conductor._parse_string(), ["Budapest"])
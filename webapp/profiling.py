@@ -0,0 +1,73 @@
+"""
+On-demand profiling of views. A request is profiled when it carries the X-Profile-Token header
+matching PROFILING_TOKEN config, or randomly according to PROFILING_SAMPLE_RATE. cProfile stats are
+written in PROFILING_DIR with a json file describing the request.
+"""
+import cProfile
+import hmac
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from functools import wraps
+
+from flask import current_app, g, request
+
+LOGGER = logging.getLogger(__name__)
+
+TOKEN_HEADER = "X-Profile-Token"
+
+
+def _profiling_trigger(config):
+    token = config.get("PROFILING_TOKEN")
+    # compared as bytes: compare_digest refuses str with non-ASCII characters, which headers may contain
+    if token and hmac.compare_digest(request.headers.get(TOKEN_HEADER, "").encode("utf-8"), token.encode("utf-8")):
+        return "header"
+    sample_rate = config.get("PROFILING_SAMPLE_RATE", 0)
+    if sample_rate and random.random() < sample_rate:
+        return "sampling"
+    return None
+
+
+def _write_profile(profiler, folder, description):
+    os.makedirs(folder, exist_ok=True)
+    name = "%s-%s-%s" % (time.strftime("%Y%m%d-%H%M%S"), request.endpoint, uuid.uuid4().hex[:8])
+    profiler.dump_stats(os.path.join(folder, name + ".prof"))
+    with open(os.path.join(folder, name + ".json"), "w") as description_file:
+        json.dump(description, description_file, ensure_ascii=False, indent=2)
+    return name
+
+
+def profiled(view):
+    """
+    decorator running a view under cProfile when profiling is triggered, views can store
+    searched terms in g.parsed_terms to describe the profile
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        config = current_app.config
+        trigger = _profiling_trigger(config)
+        if trigger is None:
+            return view(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        response = profiler.runcall(view, *args, **kwargs)
+        duration = time.perf_counter() - start
+        description = {
+            "endpoint": request.endpoint,
+            "trigger": trigger,
+            "question": request.form.get("search", ""),
+            "parsed_terms": g.get("parsed_terms", []),
+            "duration": duration,
+        }
+        name = _write_profile(profiler, config["PROFILING_DIR"], description)
+        LOGGER.info(" Request profiled in %s (%.3f s)", name, duration)
+        response = current_app.make_response(response)
+        response.headers["X-Profile"] = name
+        return response
+
+    return wrapper
@@ -0,0 +1,65 @@
+"""
+Count of SQL statements sent to databases, in total and per request. Distribution of statements
+per request is exported at /metrics: a query issued for each row of a result shows up as a shift of it.
+"""
+import threading
+from contextlib import contextmanager
+
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from webapp.metrics import METRICS, Histogram
+
+STATEMENTS_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class QueryCounter:
+    """
+    Listen to statements executed by every engine
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.per_request = Histogram(STATEMENTS_BUCKETS)
+        self._recordings = []
+        self._lock = threading.Lock()
+        event.listen(Engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, connection, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.total += 1
+            for recording in self._recordings:
+                recording.append(statement)
+        if has_request_context():
+            g.sql_statements = g.get("sql_statements", 0) + 1
+
+    def init_app(self, app):
+        """
+        observe number of statements of each request of app
+        """
+        app.after_request(self._after_request)
+
+    def _after_request(self, response):
+        self.per_request.observe(g.get("sql_statements", 0))
+        return response
+
+    @contextmanager
+    def recording(self):
+        """
+        record statements executed in any thread while block runs
+        :return: list of statements, filled while block runs
+        """
+        statements = []
+        with self._lock:
+            self._recordings.append(statements)
+        try:
+            yield statements
+        finally:
+            with self._lock:
+                self._recordings.remove(statements)
+
+
+QUERY_COUNTER = QueryCounter()
+METRICS.add_value("sql_statements_total", "SQL statements executed.", lambda: QUERY_COUNTER.total, kind="counter")
+METRICS.add_histogram("request_sql_statements", "SQL statements executed by a request.", QUERY_COUNTER.per_request)
@@ -0,0 +1,192 @@
+"""
+Hot reload of the lexicon from DATA_LOAD_CONFIG files (or LEXICON_ARTIFACT). A new generation (database words, memory lexicon,
+spelling index) is built by a background thread then swapped in: new requests use it while requests in
+progress finish on the previous one.
+Other workers follow through LEXICON_STAMP_FILE, which holds the id of the last generation and is checked
+at most every LEXICON_RELOAD_CHECK_INTERVAL seconds. SIGUSR2 makes a worker rebuild from current data: it
+must be sent to workers, gunicorn master starts a binary upgrade on SIGUSR2.
+Reloads are zero-latency with memory and artifact backends only. With database backend, rewriting Word and
+LexiconEntry tables holds a write lock for the whole rewrite: it is refused in workers (see HOT_RELOAD_BACKENDS)
+and done by "flask reload-lexicon" in a separate process, workers then follow the stamp file.
+"""
+import logging
+import os
+import signal
+import threading
+import time
+
+from flask import current_app
+
+from webapp import db
+from webapp.parser.lexicon import LEXICONS
+from webapp.parser.spelling import PLACE_NAMES_SPELLER
+from webapp.signals import lexicon_changed
+
+LOGGER = logging.getLogger(__name__)
+
+# backends whose data is rebuilt outside the database, so that a worker can reload without blocking requests
+HOT_RELOAD_BACKENDS = ("memory", "artifact")
+
+
+def read_stamp(path):
+    """
+    :return: generation id written in stamp file, 0 if there is none
+    """
+    if not path:
+        return 0
+    try:
+        with open(path, "r") as stamp_file:
+            return int(stamp_file.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def write_stamp(path, generation):
+    temporary_path = "%s.%s.tmp" % (path, os.getpid())
+    with open(temporary_path, "w") as stamp_file:
+        stamp_file.write(str(generation))
+    os.replace(temporary_path, path)
+
+
+class LexiconReloader:
+    """
+    Build and swap lexicon generations, one reload at a time
+    """
+
+    def __init__(self):
+        self.state = "idle"
+        self.error = None
+        self.duration = None
+        self._thread = None
+        self._requested = False
+        self._next_check = 0
+        self._lock = threading.Lock()
+
+    def status(self):
+        """
+        :return: dict describing loaded generation and last reload
+        """
+        return {
+            "generation": LEXICONS.generation,
+            "state": self.state,
+            "error": self.error,
+            "duration": self.duration,
+        }
+
+    def reload(self, app, rewrite_database=True, generation=None, wait=False):
+        """
+        start a reload unless one is running
+        :param app: app whose DATA_LOAD_CONFIG and LEXICON_BACKEND are used
+        :param rewrite_database: replace words of database by words of files (database backend), then
+        write the stamp file so that other workers follow
+        :param generation: id of new generation, a millisecond timestamp by default
+        :param wait: block until the new generation is installed
+        :return: True if a reload was started
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            if generation is None:
+                generation = max(int(time.time() * 1000), LEXICONS.generation + 1)
+            self.state = "running"
+            self.error = None
+            self._thread = threading.Thread(target=self._run, args=(app, rewrite_database, generation),
+                                            name="lexicon-reload", daemon=True)
+            self._thread.start()
+            thread = self._thread
+        if wait:
+            thread.join()
+        return True
+
+    def _run(self, app, rewrite_database, generation):
+        start = time.perf_counter()
+        try:
+            with app.app_context():
+                self._build_and_swap(app, rewrite_database, generation)
+                db.session.remove()
+        except Exception as error:
+            LOGGER.exception(" Lexicon reload %s failed", generation)
+            self.error = repr(error)
+            self.state = "failed"
+        else:
+            self.state = "idle"
+        finally:
+            self.duration = time.perf_counter() - start
+
+    def _build_and_swap(self, app, rewrite_database, generation):
+        from webapp.word_files_handler.initial_data_handlers import FiletoDbHandler, rebuild_lexicon_entries
+
+        data_load_config = app.config["DATA_LOAD_CONFIG"]
+        memory_backend = hot_reload_supported(app)
+        if rewrite_database and not memory_backend:
+            for category in data_load_config.keys():
+                FiletoDbHandler(db, category).replace_words_in_db()
+            rebuild_lexicon_entries(db)
+            db.session.commit()
+
+        memory, artifact = LEXICONS.load(app.config) if memory_backend else (None, None)
+        speller = PLACE_NAMES_SPELLER
+        index = None
+        if speller.max_distance > 0:
+            if artifact is not None:
+                index = artifact.spelling_index_for(speller.categories, speller.max_distance)
+            if index is None:
+                index = speller.build_index(memory or LEXICONS.database)
+
+        LEXICONS.install(memory, generation, artifact)
+        speller.install(index)
+        lexicon_changed.send(self, generation=generation)
+        if rewrite_database and app.config.get("LEXICON_STAMP_FILE"):
+            write_stamp(app.config["LEXICON_STAMP_FILE"], generation)
+        LOGGER.info(" Lexicon generation %s installed", generation)
+
+    def request(self, *args):
+        """
+        signal handler: reload on next request, from current data
+        """
+        self._requested = True
+
+    def check(self):
+        """
+        before request hook: start a reload when requested by a signal, or when another process
+        wrote a new generation in stamp file
+        """
+        app = current_app._get_current_object()
+        interval = app.config.get("LEXICON_RELOAD_CHECK_INTERVAL", 5)
+        now = time.monotonic()
+        if not self._requested and (interval <= 0 or now < self._next_check):
+            return
+        self._next_check = now + interval
+        if self._requested:
+            self._requested = False
+            self.reload(app, rewrite_database=False)
+            return
+        generation = read_stamp(app.config.get("LEXICON_STAMP_FILE"))
+        if generation > LEXICONS.generation:
+            self.reload(app, rewrite_database=False, generation=generation)
+
+
+LEXICON_RELOADER = LexiconReloader()
+
+
+def hot_reload_supported(app):
+    """
+    :return: True if LEXICON_BACKEND of app can be reloaded by a worker while it serves requests
+    """
+    return app.config.get("LEXICON_BACKEND", "database") in HOT_RELOAD_BACKENDS
+
+
+def init_reload(app):
+    """
+    data loaded from now on is the generation written in stamp file, register stamp checks
+    """
+    LEXICONS.generation = read_stamp(app.config.get("LEXICON_STAMP_FILE"))
+    app.before_request(LEXICON_RELOADER.check)
+
+
+def install_signal_handler(signum=signal.SIGUSR2):
+    """
+    make this process reload its lexicon when it receives signum. Only install it in workers:
+    SIGUSR2 sent to gunicorn master is a binary upgrade
+    """
+    signal.signal(signum, LEXICON_RELOADER.request)
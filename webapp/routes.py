@@ -1,24 +1,68 @@
-from flask import render_template, request, jsonify
+from flask import Blueprint, g, render_template, request, jsonify
 
-from webapp import app
-from webapp.search_manager import SearchConductor
+from webapp.admission import ADMISSION, ANSWER_CACHE, Overloaded
+from webapp.metrics import METRICS
+from webapp.profiling import profiled
+from webapp.search_manager import QuestionTooLong, SearchConductor
 from webapp.sentences_generator import get_random_sentence
 
+bp = Blueprint("webapp", __name__)
 
-@app.route("/")
+
+@bp.route("/")
 def index():
     return render_template("webapp/index.html")
 
 
-@app.route("/process", methods=["POST"])
+@bp.route("/process", methods=["POST"])
+@profiled
 def process():
     search_terms = ""
     if "search" in request.form:
         search_terms = request.form["search"]
-    results = SearchConductor(search_terms).make_full_search()
-    return jsonify(dict(results=results))
+    # under load, a recent answer is served at once rather than after waiting for a slot
+    if ADMISSION.saturated:
+        results = ANSWER_CACHE.get(search_terms)
+        if results is not None:
+            return cached_answer(results)
+    try:
+        with ADMISSION.admit():
+            search_conductor = SearchConductor(search_terms)
+            with METRICS.stage("process"):
+                results = search_conductor.make_full_search()
+    except Overloaded:
+        results = ANSWER_CACHE.get(search_terms)
+        if results is None:
+            raise
+        return cached_answer(results)
+    ANSWER_CACHE.put(search_terms, results)
+    g.parsed_terms = search_conductor.parsed_terms
+    return jsonify(dict(sentence=get_random_sentence(), results=results))
+
+
+def cached_answer(results):
+    response = jsonify(dict(sentence=get_random_sentence(), results=results))
+    response.headers["X-Answer-Cache"] = "hit"
+    return response
+
+
+@bp.errorhandler(Overloaded)
+def overloaded(error):
+    response = jsonify(dict(error=error.reason, sentence="Doucement petit, je ne peux pas répondre à tout le "
+                                                         "monde en même temps ! Repose-moi ta question."))
+    response.status_code = error.code
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+@bp.errorhandler(QuestionTooLong)
+def question_too_long(error):
+    response = jsonify(dict(error="question_too_long", sentence="Ta question est bien trop longue pour mes vieux "
+                                                                "yeux ! Pose-la en %d mots au plus." % error.max_tokens))
+    response.status_code = error.code
+    return response
 
 
-@app.route("/sentences")
+@bp.route("/sentences")
 def sentences():
     return jsonify({"sentence": get_random_sentence()})
@@ -1,8 +1,47 @@
 """
 module to manage all actions to do when a search is done
 """
+import re
+
+from flask import current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
 from webapp.api_connectors.controller import ApiController
+from webapp.metrics import METRICS
+from webapp.parser.cache import PARSING_CACHE
 from webapp.parser.controller import ParsingController
+from webapp.parser.spelling import PLACE_NAMES_SPELLER
+from webapp.parser.templates import QUESTION_TEMPLATES
+
+
+class QuestionTooLong(RequestEntityTooLarge):
+    """
+    raised when a question has more than MAX_QUESTION_TOKENS words and LONG_QUESTION_POLICY is "reject"
+    """
+
+    def __init__(self, max_tokens):
+        super().__init__(description="Questions are limited to %d words." % max_tokens)
+        self.max_tokens = max_tokens
+
+
+def limit_question(in_string, max_tokens, policy="truncate"):
+    """
+    apply long question policy, words after the limit are not even split
+    :param in_string: user question
+    :param max_tokens: maximum number of words, 0 disables the limit
+    :param policy: "truncate" keeps max_tokens first words, "reject" raises QuestionTooLong
+    :return: the question, truncated if it is too long
+    """
+    if max_tokens <= 0:
+        return in_string
+    end = 0
+    for count, word in enumerate(re.finditer(r"\S+", in_string), 1):
+        if count > max_tokens:
+            if policy == "reject":
+                raise QuestionTooLong(max_tokens)
+            return in_string[:end]
+        end = word.end()
+    return in_string
 
 
 class SearchConductor:
@@ -10,13 +49,39 @@ class SearchConductor:
     Conducts all action between search parsing, api calls and return of json response
     """
 
-    def __init__(self, in_string, parsing_controller=ParsingController, api_controller=ApiController):
+    def __init__(self, in_string, parsing_controller=ParsingController, api_controller=ApiController,
+                 parsing_cache=PARSING_CACHE, speller=PLACE_NAMES_SPELLER, templates=QUESTION_TEMPLATES):
         self.in_string = in_string
+        self.question = limit_question(in_string, current_app.config.get("MAX_QUESTION_TOKENS", 0),
+                                       current_app.config.get("LONG_QUESTION_POLICY", "truncate"))
         self.parsing_controller = parsing_controller
         self.api_controller = api_controller
+        self.parsing_cache = parsing_cache
+        self.speller = speller
+        self.templates = templates
+        self.parsed_terms = []
+
+    def _run_parsing_controller(self, in_string):
+        return self.parsing_controller(in_string).out_list
 
     def _parse_string(self):
-        return self.parsing_controller(self.in_string).out_list
+        if self.templates is not None:
+            subject = self.templates.match(self.question)
+            if subject is not None:
+                return [subject]
+        if self.parsing_cache is None:
+            return self._run_parsing_controller(self.question)
+        return self.parsing_cache.get(self.question, self._run_parsing_controller, namespace=self.parsing_controller)
+
+    def _correct_terms(self, searched_terms):
+        """
+        replace misspelled place name of searched term sent to apis
+        :param searched_terms: parsing results
+        :return: a new list of terms
+        """
+        if not searched_terms or self.speller is None or self.speller.max_distance < 1:
+            return searched_terms
+        return [self.speller.correct(searched_terms[0])] + searched_terms[1:]
 
     def _call_all_api(self, searched_terms):
         if searched_terms:
@@ -25,5 +90,10 @@ class SearchConductor:
 
 
     def make_full_search(self):
-        parsed_string = self._parse_string()
-        return self._call_all_api(parsed_string)
+        with METRICS.stage("parsing"):
+            parsed_string = self._parse_string()
+        with METRICS.stage("spelling"):
+            parsed_string = self._correct_terms(parsed_string)
+        self.parsed_terms = parsed_string
+        with METRICS.stage("apis"):
+            return self._call_all_api(parsed_string)
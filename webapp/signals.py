@@ -0,0 +1,10 @@
+"""
+Signals sent by the application when shared data changes
+"""
+from blinker import Namespace
+
+_signals = Namespace()
+
+# sent each time words are added to or removed from the lexicon (Word and WordType tables).
+# A generation argument means the new lexicon and indexes were already swapped in by a reload
+lexicon_changed = _signals.signal("lexicon-changed")
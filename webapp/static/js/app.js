@@ -1,4 +1,3 @@
-const sentenceUrl = "/sentences";
 const processUrl = "/process";
 let searchForm = document.querySelector("form");
 let searchBtn = document.getElementById("search-btn");
@@ -60,28 +59,14 @@ function myMap(mapDiv, lat, long) {
     let marker = new google.maps.Marker({position: center, map: map})
 }
 
-let ajaxGet = (url, callback) => {
-    let req = new XMLHttpRequest();
-    req.open("GET", url, true);
-    req.addEventListener("load", () => {
-        if (req.status >= 200 && req.status < 400) {
-            callback(req.responseText);
-        } else {
-            console.error(req.status + " " + req.statusText + " " + url)
-        }
-    });
-    req.addEventListener("error", () => {
-        console.error("Network error with url : " + url)
-    })
-    req.send();
-};
-
-let ajaxPost = (url, data, callback) => {
+let ajaxPost = (url, data, callback, busyCallback) => {
     let req = new XMLHttpRequest();
     req.open("POST", url, true);
     req.addEventListener("load", () => {
         if (req.status >= 200 && req.status < 400) {
             callback(req.responseText);
+        } else if ((req.status === 503 || req.status === 413) && busyCallback) {
+            busyCallback(req.responseText);
         } else {
             console.error(req.status + " " + req.statusText + " " + url)
         }
@@ -129,24 +114,24 @@ let addFullAnswer = (data) => {
 
 searchForm.addEventListener("submit", (e) => {
     addUserQuestion(searchForm.search.value);
-    setTimeout(() => {
-        ajaxGet(sentenceUrl, (response) => {
-            addGrandPyBaseAnswer(JSON.parse(response)['sentence']);
-            loader(true);
-            let data = new FormData(searchForm);
-            searchForm.search.value = '';
-            searchBtn.disabled = true;
-            eraseBtn.disabled = true;
-            ajaxPost(processUrl, data, (response) => {
-                loader(false);
-                searchBtn.disabled = false;
-                eraseBtn.disabled = false;
-                let receivedData = JSON.parse(response);
-                addFullAnswer(receivedData);
-            });
-        });
-    }, 500);
-
+    loader(true);
+    let data = new FormData(searchForm);
+    searchForm.search.value = '';
+    searchBtn.disabled = true;
+    eraseBtn.disabled = true;
+    ajaxPost(processUrl, data, (response) => {
+        loader(false);
+        searchBtn.disabled = false;
+        eraseBtn.disabled = false;
+        let receivedData = JSON.parse(response);
+        addGrandPyBaseAnswer(receivedData.sentence);
+        addFullAnswer(receivedData);
+    }, (response) => {
+        loader(false);
+        searchBtn.disabled = false;
+        eraseBtn.disabled = false;
+        addGrandPyBaseAnswer(JSON.parse(response).sentence);
+    });
 
     e.preventDefault();
 });
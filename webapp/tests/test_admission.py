@@ -0,0 +1,133 @@
+import re
+import threading
+import time
+
+import pytest
+import requests_mock
+from flask_testing import TestCase
+
+from webapp import app, db, load_words_to_db
+from webapp.admission import ADMISSION, ANSWER_CACHE, AdmissionController, AnswerCache, Overloaded
+
+
+class TestAdmissionController:
+    def setup_method(self):
+        self.controller = AdmissionController(max_concurrency=1, max_queue=1, max_wait=0.05, retry_after=3)
+
+    def test_admit(self):
+        with self.controller.admit():
+            assert self.controller.active == 1
+        assert self.controller.active == 0
+        assert self.controller.admitted == 1
+
+    def test_timeout(self):
+        self.controller.acquire()
+        with pytest.raises(Overloaded) as error:
+            self.controller.acquire()
+        assert error.value.reason == "timeout"
+        assert error.value.retry_after == 3
+        assert self.controller.waiting == 0
+        assert self.controller.shed["timeout"] == 1
+
+    def test_queue_full(self):
+        self.controller.max_wait = 1
+        self.controller.acquire()
+        waiter = threading.Thread(target=self.controller.acquire)
+        waiter.start()
+        while not self.controller.waiting:
+            time.sleep(0.001)
+        with pytest.raises(Overloaded) as error:
+            self.controller.acquire()
+        assert error.value.reason == "queue_full"
+        self.controller.release()
+        waiter.join()
+        assert self.controller.active == 1
+        assert self.controller.admitted == 2
+
+    def test_disabled(self):
+        self.controller.max_concurrency = 0
+        with self.controller.admit():
+            with self.controller.admit():
+                assert self.controller.active == 0
+
+
+class TestAnswerCache:
+    def test_get(self):
+        cache = AnswerCache(maxsize=1, ttl=60)
+        cache.put("Où est Paris ?", {"answer": 1})
+        assert cache.get("Où est Paris") == {"answer": 1}
+        assert cache.get("où est paris") is None
+        cache.put("Où est Lyon ?", {"answer": 2})
+        assert cache.get("Où est Paris ?") is None
+        assert cache.served == 1
+
+    def test_expired(self):
+        cache = AnswerCache(ttl=0)
+        cache.put("Où est Paris ?", {"answer": 1})
+        time.sleep(0.001)
+        assert cache.get("Où est Paris ?") is None
+        assert len(cache) == 0
+
+
+class TestProcessShedding(TestCase):
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        app.config.update(ADMISSION_MAX_CONCURRENCY=1, ADMISSION_MAX_QUEUE=0, ADMISSION_RETRY_AFTER=7)
+        ADMISSION.init_app(app)
+        ANSWER_CACHE.init_app(app)
+        return app
+
+    def setUp(self):
+        db.create_all()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+        self.in_string = "Salut GrandPy ! Est-ce que tu connais l'adresse d'Openclassrooms à Paris ?"
+
+    def tearDown(self):
+        app.config.from_object("config.TestConfig")
+        ADMISSION.init_app(app)
+        ANSWER_CACHE.init_app(app)
+        db.session.remove()
+        db.drop_all()
+
+    def post(self):
+        with requests_mock.Mocker() as mock:
+            mock.get(re.compile("maps.googleapis.com"), json={"status": "ZERO_RESULTS"})
+            mock.get(re.compile("wikipedia.org"), json=["Openclassrooms", [], [], []])
+            return self.client.post("/process", data=dict(search=self.in_string))
+
+    def test_shed(self):
+        ADMISSION.acquire()
+        try:
+            response = self.post()
+        finally:
+            ADMISSION.release()
+        self.assertEqual(503, response.status_code)
+        self.assertEqual("7", response.headers["Retry-After"])
+        self.assertEqual("queue_full", response.json["error"])
+
+    def test_answer_cache_under_overload(self):
+        answer = self.post()
+        self.assertEqual(200, answer.status_code)
+        ADMISSION.acquire()
+        try:
+            response = self.post()
+        finally:
+            ADMISSION.release()
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("hit", response.headers["X-Answer-Cache"])
+        self.assertEqual(answer.json["results"], response.json["results"])
+        self.assertIn("grandpy_admission_shed_queue_full_total 0", self.client.get("/metrics").data.decode())
+
+    def test_answer_cache_before_queuing(self):
+        self.post()
+        ADMISSION.max_queue, ADMISSION.max_wait = 1, 5
+        ADMISSION.acquire()
+        try:
+            start = time.monotonic()
+            response = self.post()
+            duration = time.monotonic() - start
+        finally:
+            ADMISSION.release()
+        self.assertEqual("hit", response.headers["X-Answer-Cache"])
+        self.assertLess(duration, 1)
+        self.assertEqual(0, ADMISSION.shed["timeout"])
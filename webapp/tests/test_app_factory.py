@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from webapp import create_app, load_secret_key
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_create_app():
+    app = create_app("config.TestConfig")
+    assert app.config["TESTING"]
+    assert "webapp.process" in app.view_functions
+    assert "init-db" in app.cli.commands
+
+
+def test_secret_key_file():
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "secret.txt")
+        secret = load_secret_key(path)
+        assert len(secret) >= 32
+        assert load_secret_key(path) == secret
+
+        class SecretConfig:
+            SECRET_KEY = None
+            SECRET_KEY_FILE = path
+            SQLALCHEMY_DATABASE_URI = "sqlite://"
+
+        assert create_app(SecretConfig).config["SECRET_KEY"] == secret
+
+
+def test_lazy_imports():
+    statement = "import sys, config; from webapp import create_app; create_app('config.ProdConfig'); " \
+                "print(' '.join(name for name in ('bs4', 'requests') if name in sys.modules))"
+    with tempfile.TemporaryDirectory() as folder:
+        env = dict(os.environ, SECRET_KEY="test", PYTHONPATH=ROOT)
+        output = subprocess.run([sys.executable, "-c", statement], cwd=folder, env=env, check=True,
+                                stdout=subprocess.PIPE, text=True).stdout
+        assert output.strip() == ""
+        assert not os.path.exists(os.path.join(folder, "secret.txt"))
@@ -0,0 +1,55 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from flask_testing import TestCase
+
+from webapp import app
+from webapp.assets import build_assets, load_manifest
+
+
+class TestAssets(TestCase):
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        return app
+
+    def setUp(self):
+        self.build_folder = tempfile.mkdtemp()
+        self.default_build_folder = app.config["ASSETS_BUILD_FOLDER"]
+        app.config["ASSETS_BUILD_FOLDER"] = self.build_folder
+        self.manifest = build_assets(app.static_folder, self.build_folder)
+
+    def tearDown(self):
+        app.config["ASSETS_BUILD_FOLDER"] = self.default_build_folder
+        shutil.rmtree(self.build_folder)
+        load_manifest.cache_clear()
+
+    def test_build(self):
+        hashed_filename = self.manifest["css/style.css"]
+        self.assertRegex(hashed_filename, r"^css/style\.[0-9a-f]{12}\.css$")
+        with open(os.path.join(app.static_folder, "css/style.css"), "rb") as in_file:
+            content = in_file.read()
+        with gzip.open(os.path.join(self.build_folder, hashed_filename + ".gz")) as gz_file:
+            self.assertEqual(gz_file.read(), content)
+        self.assertFalse(os.path.exists(os.path.join(self.build_folder, self.manifest["images/papy.jpg"] + ".gz")))
+
+    def test_url_for_override(self):
+        response = self.client.get("/")
+        self.assertIn(("/assets/" + self.manifest["js/app.js"]).encode(), response.data)
+        self.assertNotIn(b"/static/css/style.css", response.data)
+
+    def test_served_with_immutable_cache(self):
+        response = self.client.get("/assets/" + self.manifest["css/style.css"], headers={"Accept-Encoding": "gzip"})
+        self.assert200(response)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.mimetype, "text/css")
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertIn("max-age=31536000", response.headers["Cache-Control"])
+        response.close()
+
+    def test_served_uncompressed(self):
+        response = self.client.get("/assets/" + self.manifest["css/style.css"])
+        self.assert200(response)
+        self.assertNotIn("Content-Encoding", response.headers)
+        response.close()
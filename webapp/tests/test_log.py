@@ -0,0 +1,36 @@
+import json
+import logging
+
+from webapp.log import DEBUG_SAMPLING, JsonFormatter, debug_enabled, start_trace
+
+
+class TestDebugSampling:
+    def setup_method(self):
+        self.rate = DEBUG_SAMPLING["rate"]
+        self.logger = logging.getLogger("test_log")
+        self.logger.setLevel(logging.DEBUG)
+
+    def teardown_method(self):
+        DEBUG_SAMPLING["rate"] = self.rate
+        self.logger.setLevel(logging.NOTSET)
+
+    def test_level(self):
+        self.logger.setLevel(logging.INFO)
+        DEBUG_SAMPLING["rate"] = 1.0
+        assert not debug_enabled(self.logger)
+
+    def test_sampled_trace(self):
+        DEBUG_SAMPLING["rate"] = 0.0
+        start_trace()
+        assert not debug_enabled(self.logger)
+        DEBUG_SAMPLING["rate"] = 1.0
+        start_trace()
+        assert debug_enabled(self.logger)
+
+
+def test_json_formatter():
+    record = logging.LogRecord("webapp", logging.INFO, __file__, 1, " Start parsing: %s", ("Paris",), None)
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "webapp"
+    assert entry["message"] == " Start parsing: Paris"
@@ -0,0 +1,270 @@
+"""
+Memory accounting of structures loaded by a worker. An app is booted with ProdConfig in a separate
+interpreter, so that measures don't depend on what tests loaded before, and each component is built
+through it twice: once to measure resident memory growth and once under tracemalloc to measure python heap.
+Copy-on-write sharing is measured in a forked child after a few parsings.
+
+Production geonames files are not in the repository: by default, cities are replaced by a synthetic file
+of geonames size (SYNTHETIC_CITIES rows) next to the other production files, with their own budgets.
+Production budgets are checked too when data_files/cities holds the geonames files.
+Budgets are in bytes, a report is printed (pytest -s) to update them.
+"""
+import copy
+import gc
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+import unittest
+
+import config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MB = 1024 * 1024
+# measured on the synthetic cities file with about 20% headroom: a SymSpell index of geonames place names
+# weighs about 84 MB of python heap. Resident growth of components built after the lexicon is lower than
+# their heap since they reuse pages freed by the first lexicon built
+SYNTHETIC_BUDGETS = {
+    "memory_lexicon": {"heap": 240 * MB, "rss": 400 * MB},
+    "spelling_index": {"heap": 100 * MB, "rss": 100 * MB},
+    "landmark_matcher": {"heap": 1 * MB, "rss": 2 * MB},
+    "parsing_cache": {"heap": 4 * MB, "rss": 8 * MB},
+}
+# real geonames names are more varied than synthetic ones
+PRODUCTION_BUDGETS = {
+    "memory_lexicon": {"heap": 260 * MB, "rss": 420 * MB},
+    "spelling_index": {"heap": 120 * MB, "rss": 120 * MB},
+    "landmark_matcher": {"heap": 1 * MB, "rss": 2 * MB},
+    "parsing_cache": {"heap": 4 * MB, "rss": 8 * MB},
+}
+# memory of the parent lexicon copied by a child worker after serving requests
+FORKED_PRIVATE_BUDGET = 32 * MB
+# rows of geonames cities1000.txt, the largest file of production cities
+SYNTHETIC_CITIES = 140000
+SYLLABLES = ("ba", "bou", "ca", "char", "de", "du", "fon", "gar", "ia", "ker", "la", "lou", "ma", "mont", "na",
+             "ne", "pe", "ri", "roc", "sa", "sen", "ta", "ton", "va", "ville", "zo")
+PATTERNS = ("{0}", "{0}", "{0}", "Saint-{0}", "{0}-sur-{1}", "Le {0}", "{0} en {1}")
+
+
+def resident_bytes():
+    with open("/proc/self/statm", "r") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def smaps_rollup():
+    """
+    :return: dict of /proc/self/smaps_rollup values in bytes
+    """
+    values = dict()
+    with open("/proc/self/smaps_rollup", "r") as smaps:
+        for line in smaps:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return values
+
+
+def missing_data_files():
+    """
+    :return: production data files not present, budgets measured with test samples would be meaningless
+    """
+    paths = [config.Config.LANDMARKS_FILE]
+    for category_config in config.Config.DATA_LOAD_CONFIG.values():
+        paths += category_config["files"]
+    return [path for path in paths if not os.path.exists(path)]
+
+
+MISSING_DATA_FILES = missing_data_files()
+
+
+def write_synthetic_cities(path, rows=SYNTHETIC_CITIES, seed=0):
+    """
+    write a cities file in geonames format (19 tab separated columns) with names of production length
+    """
+    generator = random.Random(seed)
+
+    def name():
+        return "".join(generator.choice(SYLLABLES) for _ in range(generator.randint(3, 4))).capitalize()
+
+    with open(path, "w") as cities_file:
+        for geoname_id in range(rows):
+            city = generator.choice(PATTERNS).format(name(), name())
+            alternate_names = ",".join(name() for _ in range(generator.randint(0, 8)))
+            columns = [str(geoname_id), city, city, alternate_names, "%.5f" % generator.uniform(-90, 90),
+                       "%.5f" % generator.uniform(-180, 180), "P", "PPL", "FR", "", "00", "", "", "",
+                       str(generator.randint(1000, 100000)), "", "100", "Europe/Paris", "2020-01-01"]
+            cities_file.write("\t".join(columns) + "\n")
+
+
+def measure(build):
+    """
+    :param build: callable building a component
+    :return: tuple (component, python heap bytes, resident bytes)
+    """
+    gc.collect()
+    start = resident_bytes()
+    component = build()
+    rss = resident_bytes() - start
+    del component
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        component = build()
+        heap = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return component, heap, rss
+
+
+def production_app(data_load_config):
+    """
+    :return: an app of ProdConfig loading data_load_config in a memory lexicon, without database
+    """
+    from webapp import create_app
+    return create_app(type("MemoryBudgetConfig", (config.ProdConfig,), {
+        "SECRET_KEY": "memory-budget",
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "LEXICON_BACKEND": "memory",
+        "DATA_LOAD_CONFIG": data_load_config,
+    }))
+
+
+def load_questions():
+    with open(os.path.join(config.TestConfig.DATA_PATH, "questions/questions_sample.txt"), "r") as questions_file:
+        return [line.strip() for line in questions_file if line.strip()]
+
+
+def fill_cache(maxsize):
+    from webapp.parser.cache import ParsingCache
+    cache = ParsingCache(maxsize=maxsize)
+    questions = load_questions()
+    for index in range(cache.maxsize):
+        question = "%s %d" % (questions[index % len(questions)], index)
+        cache.get(question, lambda in_string: in_string.split())
+    return cache
+
+
+def measure_components(data_load_config):
+    """
+    :return: dict of component names and [python heap bytes, resident bytes]
+    """
+    from webapp.parser.lexicon import LEXICONS
+    from webapp.parser.matchers import LandmarkMatcher
+    from webapp.parser.spelling import PLACE_NAMES_SPELLER
+
+    app = production_app(data_load_config)
+    components = dict()
+    with app.app_context():
+        lexicon, heap, rss = measure(lambda: LEXICONS.load(app.config)[0])
+        components["memory_lexicon"] = (heap, rss)
+        builders = {
+            "spelling_index": lambda: PLACE_NAMES_SPELLER.build_index(lexicon),
+            "landmark_matcher": lambda: LandmarkMatcher.from_file(app.config["LANDMARKS_FILE"]),
+            "parsing_cache": lambda: fill_cache(app.config["PARSING_CACHE_SIZE"]),
+        }
+        for name, build in builders.items():
+            components[name] = measure(build)[1:]
+    return components
+
+
+def measure_copy_on_write(data_load_config):
+    """
+    :return: [bytes copied by a forked worker after parsing questions, bytes still shared]
+    """
+    from webapp.parser.controller import ParsingController
+    from webapp.parser.lexicon import LEXICONS
+
+    app = production_app(data_load_config)
+    with app.app_context():
+        lexicon = LEXICONS.load(app.config)[0]
+        questions = load_questions()
+        read_fd, write_fd = os.pipe()
+        # as done by webapp.warmup in gunicorn master
+        gc.collect()
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_fd)
+                before = smaps_rollup()
+                for question in questions:
+                    ParsingController(question, lexicon=lexicon)
+                gc.collect()
+                after = smaps_rollup()
+                message = "%d %d" % (after["Private_Dirty"] - before["Private_Dirty"],
+                                     after["Shared_Clean"] + after["Shared_Dirty"])
+                os.write(write_fd, message.encode())
+            finally:
+                os._exit(0)
+        gc.unfreeze()
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            copied, shared = [int(value) for value in pipe.read().split()]
+        os.waitpid(pid, 0)
+    return copied, shared
+
+
+def run_isolated(function, data_load_config):
+    """
+    call a measure function of this module in a new interpreter
+    :return: its result
+    """
+    statement = "import json, sys; from webapp.tests.test_memory_budget import %s; " \
+                "print(json.dumps(%s(json.loads(sys.argv[1]))))" % (function, function)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run([sys.executable, "-c", statement, json.dumps(data_load_config)], cwd=ROOT, env=env,
+                            check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "memory accounting reads /proc")
+class MemoryBudgetMixin:
+    budgets = PRODUCTION_BUDGETS
+    data_load_config = config.Config.DATA_LOAD_CONFIG
+
+    def test_budgets(self):
+        components = run_isolated("measure_components", self.data_load_config)
+        report = ["%-18s heap %8.1f MB  rss %8.1f MB" % (name, heap / MB, rss / MB)
+                  for name, (heap, rss) in components.items()]
+        print("\n%s\n%s" % (self.__class__.__name__, "\n".join(report)))
+
+        for name, (heap, rss) in components.items():
+            self.assertLessEqual(heap, self.budgets[name]["heap"], "%s python heap over budget" % name)
+            self.assertLessEqual(rss, self.budgets[name]["rss"], "%s resident memory over budget" % name)
+
+    @unittest.skipUnless(os.path.exists("/proc/self/smaps_rollup"), "needs smaps_rollup")
+    def test_copy_on_write_after_fork(self):
+        copied, shared = run_isolated("measure_copy_on_write", self.data_load_config)
+        print("\nforked worker: %.1f MB copied, %.1f MB still shared" % (copied / MB, shared / MB))
+        self.assertLessEqual(copied, FORKED_PRIVATE_BUDGET)
+
+
+class TestSyntheticMemoryBudget(MemoryBudgetMixin, unittest.TestCase):
+    """
+    production files, with cities replaced by a synthetic geonames file
+    """
+    budgets = SYNTHETIC_BUDGETS
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        cities_path = os.path.join(cls.folder, "cities.txt")
+        write_synthetic_cities(cities_path)
+        cls.data_load_config = copy.deepcopy(config.Config.DATA_LOAD_CONFIG)
+        cls.data_load_config["cities"]["files"] = [cities_path]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.folder)
+
+
+@unittest.skipIf(MISSING_DATA_FILES, "production data files missing: %s" % ", ".join(MISSING_DATA_FILES))
+class TestProductionMemoryBudget(MemoryBudgetMixin, unittest.TestCase):
+    """
+    production files of data_files folder
+    """
@@ -0,0 +1,78 @@
+import re
+
+import requests_mock
+from flask_testing import TestCase
+
+from webapp import app, db, load_words_to_db
+from webapp.metrics import Histogram, Metrics
+
+
+class TestMetrics:
+    def setup_method(self):
+        self.metrics = Metrics(prefix="test")
+
+    def test_stage(self):
+        with self.metrics.stage("parsing"):
+            pass
+        self.metrics.record("parsing", 0.002)
+        self.metrics.record("parsing", 20)
+        counts = dict(self.metrics.stages["parsing"].cumulative_counts())
+        assert counts[0.001] == 1
+        assert counts[0.0025] == 2
+        assert counts["+Inf"] == 3
+
+    def test_disabled(self):
+        self.metrics.enabled = False
+        with self.metrics.stage("parsing"):
+            pass
+        assert self.metrics.stages == dict()
+
+    def test_render(self):
+        self.metrics.record("apis", 0.3)
+        self.metrics.add_value("cache_size", "Cache size.", lambda: 12)
+        text = self.metrics.render()
+        assert '# TYPE test_stage_duration_seconds histogram' in text
+        assert 'test_stage_duration_seconds_bucket{stage="apis",le="0.5"} 1' in text
+        assert 'test_stage_duration_seconds_bucket{stage="apis",le="0.25"} 0' in text
+        assert 'test_stage_duration_seconds_count{stage="apis"} 1' in text
+        assert 'test_cache_size 12' in text
+
+    def test_render_histogram(self):
+        histogram = Histogram(buckets=(1, 5))
+        histogram.observe(3)
+        self.metrics.add_histogram("request_statements", "Statements of a request.", histogram)
+        text = self.metrics.render()
+        assert '# TYPE test_request_statements histogram' in text
+        assert 'test_request_statements_bucket{le="1"} 0' in text
+        assert 'test_request_statements_bucket{le="5"} 1' in text
+        assert 'test_request_statements_count 1' in text
+
+    def test_server_timing(self):
+        assert self.metrics.server_timing({"parsing": 0.0015, "apis": 0.2}) == "parsing;dur=1.50, apis;dur=200.00"
+
+
+class TestMetricsViews(TestCase):
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        return app
+
+    def setUp(self):
+        db.create_all()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    @requests_mock.Mocker(kw="mock")
+    def test_server_timing_and_metrics(self, **kwargs):
+        kwargs["mock"].get(re.compile("maps.googleapis.com"), json={"status": "ZERO_RESULTS"})
+        kwargs["mock"].get(re.compile("wikipedia.org"), json=["Openclassrooms", [], [], []])
+        response = self.client.post("/process", data=dict(search="Où se trouve le musée du Louvre à Paris ?"))
+        for stage in ("process", "parsing", "apis", "google_maps", "wikipedia_opensearch"):
+            self.assertIn(stage + ";dur=", response.headers["Server-Timing"])
+
+        response = self.client.get("/metrics")
+        self.assert200(response)
+        self.assertIn(b'grandpy_stage_duration_seconds_count{stage="process"}', response.data)
+        self.assertIn(b'grandpy_parsing_cache_misses_total', response.data)
@@ -0,0 +1,67 @@
+import json
+import os
+import pstats
+import re
+import shutil
+import tempfile
+
+import requests_mock
+from flask_testing import TestCase
+
+from webapp import app, db, load_words_to_db
+
+
+class TestProfiling(TestCase):
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        return app
+
+    def setUp(self):
+        db.create_all()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+        self.profiles_folder = tempfile.mkdtemp()
+        app.config.update(PROFILING_DIR=self.profiles_folder, PROFILING_TOKEN="secret", PROFILING_SAMPLE_RATE=0)
+        self.in_string = "Salut GrandPy ! Est-ce que tu connais l'adresse d'Openclassrooms à Paris ?"
+
+    def tearDown(self):
+        app.config.from_object("config.TestConfig")
+        shutil.rmtree(self.profiles_folder)
+        db.session.remove()
+        db.drop_all()
+
+    def post(self, headers=None):
+        with requests_mock.Mocker() as mock:
+            mock.get(re.compile("maps.googleapis.com"), json={"status": "ZERO_RESULTS"})
+            mock.get(re.compile("wikipedia.org"), json=["Openclassrooms", [], [], []])
+            return self.client.post("/process", data=dict(search=self.in_string), headers=headers or {})
+
+    def test_not_triggered(self):
+        response = self.post(headers={"X-Profile-Token": "wrong"})
+        self.assert200(response)
+        self.assertNotIn("X-Profile", response.headers)
+        self.assertEqual(os.listdir(self.profiles_folder), [])
+
+    def test_non_ascii_token(self):
+        response = self.post(headers={"X-Profile-Token": "sécret"})
+        self.assert200(response)
+        self.assertNotIn("X-Profile", response.headers)
+        app.config["PROFILING_TOKEN"] = "sécret"
+        response = self.post(headers={"X-Profile-Token": "sécret"})
+        self.assertIn("X-Profile", response.headers)
+
+    def test_triggered_by_header(self):
+        response = self.post(headers={"X-Profile-Token": "secret"})
+        self.assert200(response)
+        name = response.headers["X-Profile"]
+        with open(os.path.join(self.profiles_folder, name + ".json")) as description_file:
+            description = json.load(description_file)
+        self.assertEqual(description["question"], self.in_string)
+        self.assertEqual(description["trigger"], "header")
+        self.assertEqual(description["parsed_terms"][0], "Openclassrooms")
+        stats = pstats.Stats(os.path.join(self.profiles_folder, name + ".prof"))
+        self.assertGreater(stats.total_calls, 0)
+
+    def test_triggered_by_sampling(self):
+        app.config.update(PROFILING_TOKEN="", PROFILING_SAMPLE_RATE=1.0)
+        response = self.post(headers={"X-Profile-Token": ""})
+        self.assertIn("X-Profile", response.headers)
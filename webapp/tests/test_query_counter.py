@@ -0,0 +1,57 @@
+import re
+
+import requests_mock
+from flask_testing import TestCase
+from sqlalchemy.exc import InvalidRequestError
+
+from webapp import app, db, load_words_to_db
+from webapp.models import Word
+from webapp.query_counter import QUERY_COUNTER
+
+# statements of a /process call once lexicon categories are known: LexiconEntry lookup only,
+# whatever the number of distinct words of the question
+MAX_PROCESS_STATEMENTS = 1
+
+
+class TestQueryCounter(TestCase):
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        return app
+
+    def setUp(self):
+        db.create_all()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def test_recording(self):
+        total = QUERY_COUNTER.total
+        with QUERY_COUNTER.recording() as statements:
+            db.session.query(Word).count()
+        self.assertEqual(1, len(statements))
+        self.assertEqual(total + 1, QUERY_COUNTER.total)
+
+    def test_no_lazy_load(self):
+        word = db.session.query(Word).first()
+        with self.assertRaises(InvalidRequestError):
+            word.word_type
+
+    @requests_mock.Mocker(kw="mock")
+    def test_process_statements(self, **kwargs):
+        kwargs["mock"].get(re.compile("maps.googleapis.com"), json={"status": "ZERO_RESULTS"})
+        kwargs["mock"].get(re.compile("wikipedia.org"), json=["Openclassrooms", [], [], []])
+        self.client.post("/process", data=dict(search="Bonjour ! Je voudrais aller à Lyon demain"))
+        for question in ("Salut GrandPy ! Est-ce que tu connais l'adresse d'Openclassrooms à Paris ?",
+                         "Salut GrandPy ! " + "Je pars de Lyon pour aller voir la tour Eiffel à Paris. " * 200,
+                         # MAX_QUESTION_TOKENS distinct words give more phrase candidates than a chunk of keys
+                         " ".join("Mot%d" % index for index in range(app.config["MAX_QUESTION_TOKENS"]))):
+            with QUERY_COUNTER.recording() as statements:
+                response = self.client.post("/process", data=dict(search=question))
+            self.assert200(response)
+            self.assertLessEqual(len(statements), MAX_PROCESS_STATEMENTS, statements)
+
+        response = self.client.get("/metrics")
+        self.assertIn(b'grandpy_request_sql_statements_bucket{le="1"}', response.data)
+        self.assertIn(b'grandpy_sql_statements_total', response.data)
@@ -0,0 +1,96 @@
+import copy
+import os
+import shutil
+import tempfile
+
+from flask_testing import TestCase
+
+import config
+
+from webapp import app, db, load_words_to_db
+from webapp.models import Word, WordType
+from webapp.parser.cache import PARSING_CACHE
+from webapp.parser.lexicon import LEXICONS
+from webapp.parser.spelling import PLACE_NAMES_SPELLER
+from webapp.reload import LEXICON_RELOADER, read_stamp, write_stamp
+
+
+class TestLexiconReload(TestCase):
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        return app
+
+    def setUp(self):
+        db.create_all()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+        self.folder = tempfile.mkdtemp()
+        stop_words_file = os.path.join(self.folder, "stop_words.txt")
+        shutil.copy(app.config["DATA_LOAD_CONFIG"]["stop_words"]["files"][0], stop_words_file)
+        with open(stop_words_file, "a") as words_file:
+            words_file.write("\ngrandpy")
+        data_load_config = copy.deepcopy(app.config["DATA_LOAD_CONFIG"])
+        data_load_config["stop_words"]["files"] = [stop_words_file]
+        app.config.update(DATA_LOAD_CONFIG=data_load_config, ADMIN_TOKEN="secret",
+                          LEXICON_STAMP_FILE=os.path.join(self.folder, "lexicon.stamp"))
+        self.generation = LEXICONS.generation
+
+    def tearDown(self):
+        app.config.from_object("config.TestConfig")
+        LEXICONS.install(None, self.generation)
+        shutil.rmtree(self.folder)
+        db.session.remove()
+        db.drop_all()
+
+    def stop_words(self):
+        return [word.word for word in Word.query.join(WordType, Word.category == WordType.id)
+                .filter(WordType.type_name == "stop_words")]
+
+    def test_database_reload(self):
+        count = len(self.stop_words())
+        PARSING_CACHE.get("Où est Paris ?", lambda in_string: ["Paris"])
+        self.assertTrue(LEXICON_RELOADER.reload(app, wait=True))
+        self.assertEqual("idle", LEXICON_RELOADER.state)
+        self.assertIn("grandpy", self.stop_words())
+        self.assertEqual(count + 1, len(self.stop_words()))
+        self.assertGreater(LEXICONS.generation, self.generation)
+        self.assertEqual(LEXICONS.generation, read_stamp(app.config["LEXICON_STAMP_FILE"]))
+        self.assertEqual(0, len(PARSING_CACHE))
+        self.assertIn("Paris", PLACE_NAMES_SPELLER._index.words.values())
+
+    def test_memory_reload(self):
+        data_load_config = app.config["DATA_LOAD_CONFIG"]
+        app.config.update(LEXICON_BACKEND="memory", DATA_LOAD_CONFIG=config.TestConfig.DATA_LOAD_CONFIG)
+        previous = LEXICONS.get()
+        app.config["DATA_LOAD_CONFIG"] = data_load_config
+        LEXICON_RELOADER.reload(app, wait=True)
+        lexicon = LEXICONS.get()
+        self.assertIsNot(previous, lexicon)
+        self.assertEqual([("grandpy", "stop_words")], lexicon.lookup(["grandpy"]))
+        self.assertEqual([], previous.lookup(["grandpy"]))
+        self.assertNotIn("grandpy", self.stop_words())
+
+    def test_follow_stamp(self):
+        write_stamp(app.config["LEXICON_STAMP_FILE"], self.generation + 10)
+        app.config["LEXICON_RELOAD_CHECK_INTERVAL"] = 0.001
+        LEXICON_RELOADER._next_check = 0
+        self.client.get("/sentences")
+        LEXICON_RELOADER._thread.join()
+        self.assertEqual(self.generation + 10, LEXICONS.generation)
+        self.assertNotIn("grandpy", self.stop_words())
+
+    def test_admin_endpoint(self):
+        self.assertEqual(403, self.client.post("/admin/lexicon/reload").status_code)
+        self.assertEqual(403, self.client.get("/admin/lexicon", headers={"X-Admin-Token": "sécret"}).status_code)
+        response = self.client.post("/admin/lexicon/reload", headers={"X-Admin-Token": "secret"})
+        self.assertEqual(409, response.status_code)
+        self.assertFalse(response.json["started"])
+        self.assertNotIn("grandpy", self.stop_words())
+        app.config["LEXICON_BACKEND"] = "memory"
+        response = self.client.post("/admin/lexicon/reload", headers={"X-Admin-Token": "secret"})
+        self.assertEqual(202, response.status_code)
+        LEXICON_RELOADER._thread.join()
+        status = self.client.get("/admin/lexicon", headers={"X-Admin-Token": "secret"}).json
+        self.assertEqual("idle", status["state"])
+        self.assertEqual(LEXICONS.generation, status["generation"])
+        app.config["ADMIN_TOKEN"] = ""
+        self.assertEqual(404, self.client.get("/admin/lexicon").status_code)
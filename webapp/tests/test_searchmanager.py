@@ -7,9 +7,11 @@ from flask_testing import TestCase
 
 from config import GOOGLE_MAP_API_KEY
 from webapp import app
-from webapp.models import db
-from webapp.search_manager import SearchConductor
-from webapp.word_files_handler.initial_data_handlers import FiletoDbHandler
+from webapp.models import db, Word, WordType
+from webapp.parser.matchers import normalize_key
+from webapp.search_manager import QuestionTooLong, SearchConductor, limit_question
+from webapp.signals import lexicon_changed
+from webapp.word_files_handler.initial_data_handlers import load_words_to_db, rebuild_lexicon_entries
 
 
 class TestSearchConductor(TestCase):
@@ -20,8 +22,7 @@ class TestSearchConductor(TestCase):
     def setUp(self):
         self.in_string = "Salut GrandPy ! Est-ce que tu connais l'adresse d'Openclassrooms à Paris ?"
         db.create_all()
-        for key in app.config["DATA_LOAD_CONFIG"].keys():
-            FiletoDbHandler(db, key)()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
         self.parsing_results = ['Openclassrooms', 'à', 'Paris', 'd', 'adresse']
         search_term = 'Openclassrooms'
         self.google_map_api_url = "https://maps.googleapis.com/maps/api/geocode/json?address=%s&key=%s" % (
@@ -154,6 +155,37 @@ class TestSearchConductor(TestCase):
         self.assertIn("wikipedia_api_results", full_search_result.keys())
         self.assertEqual(full_search_result, self.json_results)
 
+    def test_limit_question(self):
+        self.assertEqual(limit_question("Où se trouve  la tour Eiffel ?", 4), "Où se trouve  la")
+        self.assertEqual(limit_question("Où se trouve Paris?", 4), "Où se trouve Paris?")
+        self.assertEqual(limit_question("Où se trouve Paris ?", 0), "Où se trouve Paris ?")
+        with self.assertRaises(QuestionTooLong):
+            limit_question("Où se trouve la tour Eiffel ?", 4, "reject")
+
+    def test_long_question_truncated(self):
+        app.config["MAX_QUESTION_TOKENS"] = 4
+        try:
+            search_conductor = SearchConductor(self.in_string + " et où se trouve Budapest ?" * 1000)
+        finally:
+            app.config["MAX_QUESTION_TOKENS"] = 300
+        self.assertEqual(search_conductor.question, "Salut GrandPy ! Est-ce")
+
+    def test_correct_misspelled_place(self):
+        search_conductor = SearchConductor("Que sais-tu de Budapets ?")
+        self.assertEqual(search_conductor._correct_terms(["Budapets", "sais"]), ["Budapest", "sais"])
+        self.assertEqual(search_conductor._correct_terms(["Openclassrooms"]), ["Openclassrooms"])
+        self.assertEqual(search_conductor._correct_terms(["Pau"]), ["Pau"])
+
+    def test_known_word_not_corrected(self):
+        french_words = WordType.query.filter(WordType.type_name == "french_words").one()
+        db.session.add(Word(word="paria", key=normalize_key("paria"), category=french_words.id))
+        rebuild_lexicon_entries(db)
+        db.session.commit()
+        lexicon_changed.send(self)
+        search_conductor = SearchConductor("Que sais-tu du Paria ?")
+        self.assertEqual(search_conductor._correct_terms(["Paria", "sais"]), ["Paria", "sais"])
+        self.assertEqual(search_conductor._correct_terms(["Parix", "sais"]), ["Paris", "sais"])
+
     def test_space_search(self):
         search_conductor = SearchConductor(" ")
         full_search_result = search_conductor.make_full_search()
@@ -1,6 +1,10 @@
+import re
+
+import requests_mock
 from flask_testing import TestCase
 
-from webapp import app, db, FiletoDbHandler
+from webapp import app, db, load_words_to_db
+from webapp.sentences_generator import RANDOM_SENTENCES
 
 
 class TestIndexView(TestCase):
@@ -30,8 +34,7 @@ class TestProcessView(TestCase):
     def setUp(self):
         self.in_string = "Salut GrandPy ! Est-ce que tu connais l'adresse d'Openclassrooms à Paris ?"
         db.create_all()
-        for key in app.config["DATA_LOAD_CONFIG"].keys():
-            FiletoDbHandler(db, key)()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
 
     def test_success(self):
         self.assert200(self.client.post("/process", follow_redirects=True, data=dict(search=self.in_string)))
@@ -41,6 +44,25 @@ class TestProcessView(TestCase):
         for response in request.response:
             self.assertIsInstance(response, bytes)
 
+    @requests_mock.Mocker(kw="mock")
+    def test_sentence_and_results_in_one_response(self, **kwargs):
+        kwargs["mock"].get(re.compile("maps.googleapis.com"), json={"status": "ZERO_RESULTS"})
+        kwargs["mock"].get(re.compile("wikipedia.org"), json=["Openclassrooms", [], [], []])
+        response = self.client.post("/process", data=dict(search=self.in_string))
+        self.assert200(response)
+        self.assertIn(response.json["sentence"], RANDOM_SENTENCES)
+        self.assertIn("google_maps_api_results", response.json["results"])
+        self.assertIn("wikipedia_api_results", response.json["results"])
+
+    def test_long_question_rejected(self):
+        app.config.update(MAX_QUESTION_TOKENS=5, LONG_QUESTION_POLICY="reject")
+        try:
+            response = self.client.post("/process", data=dict(search=self.in_string))
+        finally:
+            app.config.update(MAX_QUESTION_TOKENS=300, LONG_QUESTION_POLICY="truncate")
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json["error"], "question_too_long")
+
 
 class TestSentencesView(TestCase):
     render_templates = False
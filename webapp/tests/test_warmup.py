@@ -0,0 +1,48 @@
+import gc
+import logging.handlers
+
+from flask_testing import TestCase
+
+from webapp import app, db, load_words_to_db
+from webapp.api_connectors import connectors
+from webapp.parser.cache import PARSING_CACHE
+from webapp.parser.spelling import PLACE_NAMES_SPELLER
+from webapp.warmup import post_fork, warm_up
+
+
+class TestWarmUp(TestCase):
+    def create_app(self):
+        app.config.from_object("config.TestConfig")
+        return app
+
+    def setUp(self):
+        db.create_all()
+        load_words_to_db(db, app.config["DATA_LOAD_CONFIG"])
+        PARSING_CACHE.clear()
+
+    def tearDown(self):
+        gc.unfreeze()
+        PARSING_CACHE.clear()
+        db.session.remove()
+        db.drop_all()
+
+    def test_warm_up(self):
+        durations = warm_up(app)
+        self.assertEqual(["lexicon", "spelling_index", "parsers", "wikipedia_store", "parsing_cache"], list(durations))
+        self.assertIsNotNone(PLACE_NAMES_SPELLER._index)
+        self.assertEqual(len(app.config["WARMUP_QUESTIONS"]), len(PARSING_CACHE))
+        self.assertGreater(gc.get_freeze_count(), 0)
+
+    def test_failing_step_is_skipped(self):
+        db.drop_all()
+        durations = warm_up(app, freeze=False)
+        self.assertIn("parsing_cache", durations)
+        self.assertEqual(0, gc.get_freeze_count())
+
+    def test_post_fork(self):
+        session = connectors.get_session()
+        listener = app.extensions.get("log_listener")
+        post_fork(app)
+        self.assertIsNot(session, connectors.get_session())
+        self.assertIsNot(listener, app.extensions.get("log_listener"))
+        self.assertIsInstance(app.extensions["log_listener"], logging.handlers.QueueListener)
@@ -0,0 +1,91 @@
+"""
+Warm-up run by gunicorn master before forking workers (preload_app), and setup of each worker after fork.
+Everything loaded here is shared by workers with copy-on-write, the gc generation is frozen so that
+collections in workers do not write on these pages.
+"""
+import gc
+import logging
+import time
+
+from bs4 import BeautifulSoup
+
+from flask import current_app
+
+from webapp import db
+from webapp.api_connectors.connectors import WikipediaApiConnector, reset_sessions
+from webapp.log import configure_logging
+from webapp.parser.lexicon import LEXICONS
+from webapp.parser.matchers import get_landmark_matcher
+from webapp.parser.spelling import PLACE_NAMES_SPELLER
+from webapp.search_manager import SearchConductor
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _load_lexicon():
+    LEXICONS.get()
+
+
+def _load_spelling_index():
+    if PLACE_NAMES_SPELLER.max_distance > 0:
+        return PLACE_NAMES_SPELLER.index
+
+
+def _compile_parsers():
+    get_landmark_matcher(current_app.config["LANDMARKS_FILE"])
+    BeautifulSoup("<p>GrandPy</p>", "html.parser").find_all("p")
+
+
+def _open_wikipedia_store():
+    WikipediaApiConnector._configured_store()
+
+
+def _parse_questions():
+    for question in current_app.config.get("WARMUP_QUESTIONS", ()):
+        conductor = SearchConductor(question)
+        conductor._correct_terms(conductor._parse_string())
+
+
+WARMUP_STEPS = (
+    ("lexicon", _load_lexicon),
+    ("spelling_index", _load_spelling_index),
+    ("parsers", _compile_parsers),
+    ("wikipedia_store", _open_wikipedia_store),
+    ("parsing_cache", _parse_questions),
+)
+
+
+def warm_up(app, freeze=True):
+    """
+    load lexicon and indexes, compile parser patterns and fill parsing cache.
+    A failing step is logged, workers would then load it on first use.
+    :param app: app served by workers
+    :param freeze: move all objects to gc permanent generation
+    :return: dict of step durations in seconds
+    """
+    durations = dict()
+    with app.app_context():
+        for name, step in WARMUP_STEPS:
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception:
+                LOGGER.exception(" Warm-up step %s failed", name)
+            durations[name] = time.perf_counter() - start
+        db.session.remove()
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    LOGGER.info(" Warm-up done: %s", ", ".join("%s %.3fs" % item for item in durations.items()))
+    return durations
+
+
+def post_fork(app):
+    """
+    per worker setup: database connections, logging thread and http pools of master must not be used
+    :param app: app served by workers
+    """
+    with app.app_context():
+        db.engine.dispose(close=False)
+    configure_logging(app)
+    reset_sessions()
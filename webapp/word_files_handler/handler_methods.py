@@ -1,9 +1,9 @@
-from webapp import app
+from flask import current_app
 
 
 def insert_stop_words():
     words = list()
-    for file in app.config["DATA_LOAD_CONFIG"]["stop_words"]["files"]:
+    for file in current_app.config["DATA_LOAD_CONFIG"]["stop_words"]["files"]:
         with open(file, "r") as word_file:
             words += word_file.read().split("\n")
     return set(words)
@@ -11,7 +11,7 @@ def insert_stop_words():
 
 def insert_french_words():
     words = list()
-    for file in app.config["DATA_LOAD_CONFIG"]["french_words"]["files"]:
+    for file in current_app.config["DATA_LOAD_CONFIG"]["french_words"]["files"]:
         with open(file, "r") as word_file:
             words += word_file.read().split("\n")
     return set(words)
@@ -20,7 +20,7 @@ def insert_french_words():
 def insert_cities():
     cities = list()
     words = list()
-    for file in app.config["DATA_LOAD_CONFIG"]["cities"]["files"]:
+    for file in current_app.config["DATA_LOAD_CONFIG"]["cities"]["files"]:
         with open(file, 'r') as word_file:
             l = word_file.read()
             line_list = l.split("\n")
@@ -33,7 +33,7 @@ def insert_cities():
 def insert_countries():
     words = list()
     countries = list()
-    for file in app.config["DATA_LOAD_CONFIG"]["countries"]["files"]:
+    for file in current_app.config["DATA_LOAD_CONFIG"]["countries"]["files"]:
         with open(file, "r") as word_file:
             line = word_file.read().replace('"', "")
             line_list = line.split("\n")
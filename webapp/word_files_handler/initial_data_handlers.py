@@ -1,7 +1,66 @@
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import distinct, func, insert, inspect, literal, select, text, update
 
-from webapp import app
-from webapp.models import db, WordType, Word
+from webapp.models import db, WordType, Word, LexiconEntry
+from webapp.parser.matchers import normalize_key
+from webapp.signals import lexicon_changed
+
+
+def rebuild_lexicon_entries(database: SQLAlchemy):
+    """
+    fill LexiconEntry table from Word table in one statement, the caller commits the session.
+    Bits of a key are summed, not or-ed, as SQLite has no bitwise aggregate: distinct bits give the same result.
+    """
+    bit = literal(1, db.Integer).op("<<")(Word.category - 1)
+    database.session.query(LexiconEntry).delete()
+    database.session.execute(insert(LexiconEntry).from_select(
+        ["key", "categories"], select(Word.key, func.sum(distinct(bit))).group_by(Word.key)))
+
+
+def upgrade_schema(database: SQLAlchemy, batch_size=5000):
+    """
+    bring a database created before Word.key and LexiconEntry up to date: db.create_all() does not add
+    columns to existing tables. Key column is added and filled, missing tables and indexes are created,
+    then LexiconEntry table is filled. Running it on an up to date database only rebuilds LexiconEntry.
+    :return: number of words whose key was filled
+    """
+    engine = database.engine
+    if "key" not in [column["name"] for column in inspect(engine).get_columns(Word.__tablename__)]:
+        with engine.begin() as connection:
+            # nullable until words are filled, SQLite can't add a NOT NULL column without default
+            connection.execute(text("ALTER TABLE %s ADD COLUMN key VARCHAR(200)" % Word.__tablename__))
+    filled = 0
+    while True:
+        rows = database.session.query(Word.id, Word.word).filter(Word.key.is_(None)).limit(batch_size).all()
+        if not rows:
+            break
+        database.session.execute(update(Word), [{"id": word_id, "key": normalize_key(word)} for word_id, word in rows])
+        database.session.commit()
+        filled += len(rows)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE %s ALTER COLUMN key SET NOT NULL" % Word.__tablename__))
+    Word.key_index.create(engine, checkfirst=True)
+    database.create_all()
+    rebuild_lexicon_entries(database)
+    database.session.commit()
+    lexicon_changed.send(database)
+    return filled
+
+
+def load_words_to_db(database: SQLAlchemy, categories):
+    """
+    add words of categories to Word table then fill LexiconEntry table once, rebuilding it after each
+    category would cost categories × total words. Lexicon change is signaled once words can be looked up.
+    :param categories: DATA_LOAD_CONFIG keys
+    """
+    categories = list(categories)
+    for category in categories:
+        FiletoDbHandler(database, category).add_word_to_db()
+    rebuild_lexicon_entries(database)
+    database.session.commit()
+    lexicon_changed.send(database, categories=categories)
 
 
 class FiletoDbHandler:
@@ -17,16 +76,22 @@ class FiletoDbHandler:
                                                                               self.category_name).first()
         self.files = files
         if not files:
-            self.files = app.config["DATA_LOAD_CONFIG"][self.category_name]["files"]
+            self.files = current_app.config["DATA_LOAD_CONFIG"][self.category_name]["files"]
         if handler_method is not None:
             handler = handler_method
         else:
-            handler = app.config["DATA_LOAD_CONFIG"][self.category_name]["handler"]
+            handler = current_app.config["DATA_LOAD_CONFIG"][self.category_name]["handler"]
         exec("from .handler_methods import %s" % handler)
         self.data_handler = eval(handler)
 
     def __call__(self, *args, **kwargs):
+        """
+        add words of category and rebuild LexiconEntry table, use load_words_to_db to load several categories
+        """
         self.add_word_to_db()
+        rebuild_lexicon_entries(self.database)
+        self.database.session.commit()
+        lexicon_changed.send(self, category=self.category_name)
 
     def _add_category_to_db(self):
         if not self.category_instance:
@@ -35,10 +100,22 @@ class FiletoDbHandler:
             self.database.session.commit()
 
     def add_word_to_db(self):
+        """
+        add words of category to Word table, without filling LexiconEntry table
+        """
         self._add_category_to_db()
         data = self.data_handler()
         for word in data:
-            db.session.add(Word(word=word, category=self.category_instance.id))
+            db.session.add(Word(word=word, key=normalize_key(word), category=self.category_instance.id))
 
-        db.session.flush()
         db.session.commit()
+
+    def replace_words_in_db(self):
+        """
+        replace words of category by words of files, the caller rebuilds lexicon entries
+        and commits the session
+        """
+        self._add_category_to_db()
+        self.database.session.query(Word).filter(Word.category == self.category_instance.id).delete()
+        for word in self.data_handler():
+            self.database.session.add(Word(word=word, key=normalize_key(word), category=self.category_instance.id))